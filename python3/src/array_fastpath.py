@@ -0,0 +1,131 @@
+import re
+
+from . import validators
+from .schema_dsl_common import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NUMERIC_TYPES = {
+    'Integer': frozenset([int]),
+    'Number': frozenset([int, float])
+}
+
+NUMERIC_MASKS = {
+    validators.Minimum: lambda values, low: values < low,
+    validators.ExclusiveMinimum: lambda values, low: values <= low,
+    validators.Maximum: lambda values, high: values > high,
+    validators.ExclusiveMaximum: lambda values, high: values >= high,
+    validators.Range: lambda values, low, high: (values < low) | (values > high)
+}
+
+MAX_EXACT_FLOAT_INTEGER = 2 ** 53
+
+STRING_TYPES = frozenset([str])
+
+
+def _max_length_check(length):
+    return lambda values: max(map(len, values), default=0) <= length
+
+
+def _min_length_check(length):
+    return lambda values: min(map(len, values), default=length) >= length
+
+
+def _length_range_check(low, high):
+    return lambda values: not values or (min(map(len, values)) >= low and max(map(len, values)) <= high)
+
+
+def _only_check(*options):
+    option_set = frozenset(options)
+    return lambda values: all(map(option_set.__contains__, values))
+
+
+def _pattern_check(pattern):
+    match = re.compile(pattern).match
+    return lambda values: all(map(match, values))
+
+
+STRING_CHECKS = {
+    validators.MaxLength: _max_length_check,
+    validators.MinLength: _min_length_check,
+    validators.LengthRange: _length_range_check,
+    validators.Only: _only_check,
+    validators.Pattern: _pattern_check
+}
+
+
+def _string_check(flt):
+    if flt.action is validators._not_null:
+        return lambda values: True
+    if flt.action is validators._not_empty:
+        return lambda values: '' not in values
+    if flt.factory in STRING_CHECKS:
+        return STRING_CHECKS[flt.factory](*flt.params)
+    return None
+
+
+def _to_numeric_array(input_object, types):
+    values = numpy.array(input_object)
+    if values.dtype.kind not in 'if':
+        return None
+    if values.dtype.kind == 'f' and int in types and len(values) and \
+            numpy.abs(values).max() >= MAX_EXACT_FLOAT_INTEGER:
+        return None
+    return values
+
+
+def _is_exact_bound(values, bound):
+    if values.dtype.kind == 'f':
+        return isinstance(bound, float) or abs(bound) < MAX_EXACT_FLOAT_INTEGER
+    if isinstance(bound, float):
+        return abs(bound) < MAX_EXACT_FLOAT_INTEGER
+    limits = numpy.iinfo(values.dtype)
+    return limits.min <= bound <= limits.max
+
+
+def numeric_array(schema, converter, element, as_ndarray, passthrough=False):
+    allowed_types = NUMERIC_TYPES.get(schema['element_type']['type'])
+    if allowed_types is None or not all([x.factory in NUMERIC_MASKS for x in schema['filters']]):
+        return None
+    checks = tuple([(NUMERIC_MASKS[x.factory], x.params) for x in schema['filters']])
+    bounds = tuple([bound for x in schema['filters'] for bound in x.params])
+
+    def f(input_object, path):
+        if not isinstance(input_object, list):
+            return converter(input_object, path)
+        types = set(map(type, input_object))
+        values = _to_numeric_array(input_object, types) if types <= allowed_types else None
+        if values is None or not all([_is_exact_bound(values, x) for x in bounds]):
+            return converter(input_object, path)
+        bad = numpy.zeros(len(values), dtype=bool)
+        for mask, params in checks:
+            bad |= mask(values, *params)
+        if bad.any():
+            i = int(bad.argmax())
+            element(input_object[i], PathNode(path, i))
+        if as_ndarray:
+            return values
+        return input_object if passthrough else list(input_object)
+
+    return f
+
+
+def string_array(schema, converter, filters, passthrough=False):
+    if schema['element_type']['type'] != 'String':
+        return None
+    checks = tuple([_string_check(x) for x in filters])
+    if None in checks:
+        return None
+
+    def f(input_object, path):
+        if isinstance(input_object, list) and set(map(type, input_object)) <= STRING_TYPES:
+            for check in checks:
+                if not check(input_object):
+                    return converter(input_object, path)
+            return input_object if passthrough else list(input_object)
+        return converter(input_object, path)
+
+    return f
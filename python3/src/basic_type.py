@@ -1,5 +1,9 @@
+import collections.abc
+
 from .schema_dsl_common import *
 
+NON_ARRAY_TYPES = (str, bytes, bytearray, dict)
+
 
 def any_type(value, path):
     return value
@@ -10,7 +14,7 @@ def string_type(value, path):
     if value is None:
         return None
     if not isinstance(value, str):
-        raise TypeError(get_message(path, 'Should be a string'))
+        raise SchemaTypeError(path, 'not_string')
     return value
 
 
@@ -19,7 +23,7 @@ def integer_type(value, path):
     if value is None:
         return None
     if isinstance(value, bool) or not isinstance(value, int):
-        raise TypeError(get_message(path, 'Should be an integer'))
+        raise SchemaTypeError(path, 'not_integer')
     return value
 
 
@@ -28,7 +32,7 @@ def number_type(value, path):
     if value is None:
         return None
     if isinstance(value, bool) or not isinstance(value, (int, float)):
-        raise TypeError(get_message(path, 'Should be a number'))
+        raise SchemaTypeError(path, 'not_number')
     return value
 
 
@@ -37,16 +41,26 @@ def boolean_type(value, path=None):
     if value is None:
         return None
     if not isinstance(value, bool):
-        raise TypeError(get_message(path, 'Should be a boolean'))
+        raise SchemaTypeError(path, 'not_boolean')
     return value
 
 
+def is_array(value):
+    return isinstance(value, list) or \
+        (isinstance(value, collections.abc.Iterable) and not isinstance(value, NON_ARRAY_TYPES))
+
+
+STRING_TYPES = frozenset([str])
+
+
 def _validate_string_map(value, path):
     if not isinstance(value, dict):
-        raise TypeError(get_message(path, 'Should be an object'))
+        raise SchemaTypeError(path, 'not_object')
+    if set(map(type, value.values())) <= STRING_TYPES:
+        return
     for k, v in value.items():
         if not isinstance(v, str):
-            raise TypeError(get_message(path + [k], 'Should be a string'))
+            raise SchemaTypeError(path + [k], 'not_string')
 
 
 def string_map(value, path):
@@ -12,7 +12,7 @@ def to_datetime(value, path):
     try:
         return datetime.datetime.strptime(value, JSON_TIME_FORMAT)
     except ValueError as e:
-        raise ValueError(get_message(path, 'Invalid value'))
+        raise SchemaValueError(path, 'invalid_value', JSON_TIME_FORMAT)
 
 
 def to_timestamp(value, path):
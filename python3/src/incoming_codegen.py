@@ -0,0 +1,233 @@
+import hashlib
+import re
+
+from . import basic_type
+from .incoming_compiler import TYPE_CHECKS, inline_pipeline, merge_filters
+from .schema_dsl_common import *
+
+HEADER = '# Generated by json-schema-dsl incoming_codegen, do not edit.\n'
+FINGERPRINT_PREFIX = '# fingerprint: '
+
+
+def _describe_filters(filters):
+    return [(f.name, f.params) for f in filters]
+
+
+def _describe(schema, refs):
+    schema_type = schema['type']
+    if schema_type == 'Object':
+        fields = [(x['name'], _describe(x['field_type'], refs), _describe_filters(x['filters']))
+                  for x in schema['fields']]
+        return [schema_type, fields]
+    if schema_type == 'Array':
+        return [schema_type, _describe(schema['element_type'], refs), _describe_filters(schema['filters'])]
+    if schema_type == 'Either':
+        return [schema_type, [_describe(x, refs) for x in schema['types']]]
+    if schema_type == 'TaggedUnion':
+        return [schema_type, schema['tag'], [(tag, _describe(x, refs)) for tag, x in schema['branches'].items()]]
+    if schema_type == 'Ref':
+        target = resolve_ref(schema)
+        if id(target) in refs:
+            return [schema_type, refs[id(target)]]
+        refs[id(target)] = len(refs)
+        return [schema_type, refs[id(target)], _describe(target, refs)]
+    return schema_type
+
+
+def _collect_chain_filters(schema, chain, filters, refs):
+    if inline_pipeline(schema, chain, [], 0) is None:
+        _collect_filters(schema, filters, refs)
+        filters += merge_filters(chain)
+
+
+def _collect_filters(schema, filters, refs):
+    schema = resolve_ref(schema)
+    if id(schema) in refs:
+        return filters
+    refs.add(id(schema))
+    schema_type = schema['type']
+    if schema_type == 'Object':
+        for field in schema['fields']:
+            _collect_chain_filters(field['field_type'], field['filters'], filters, refs)
+    elif schema_type == 'Array':
+        _collect_chain_filters(schema['element_type'], schema['filters'], filters, refs)
+    elif schema_type == 'Either':
+        for data_type in schema['types']:
+            _collect_filters(data_type, filters, refs)
+    elif schema_type == 'TaggedUnion':
+        for branch in schema['branches'].values():
+            _collect_filters(branch, filters, refs)
+    return filters
+
+
+def schema_fingerprint(schema):
+    return hashlib.sha1(repr(_describe(schema, {})).encode('utf-8')).hexdigest()
+
+
+class _Generator:
+    def __init__(self):
+        self.functions = []
+        self.constants = []
+        self.dispatch_tables = []
+        self.filters = []
+        self.names = {}
+
+    def _add_filter(self, flt):
+        self.filters.append(flt)
+        return 'filter_%d' % (len(self.filters) - 1)
+
+    def _emit_value(self, schema, filters, lines, indent):
+        pad = ' ' * indent
+        schema_type = schema['type']
+        pipeline = inline_pipeline(schema, filters, self.constants, indent)
+        if pipeline is not None:
+            lines += pipeline
+            return
+        if schema_type in TYPE_CHECKS:
+            check, code = TYPE_CHECKS[schema_type]
+            lines.append(pad + 'if v is not None and (%s):' % check)
+            lines.append(pad + '    raise SchemaTypeError(p, %r)' % code)
+        elif schema_type == 'StringMap':
+            lines.append(pad + 'v = string_map(v, p)')
+        else:
+            lines.append(pad + 'v = %s(v, p)' % self.generate(schema))
+        for flt in merge_filters(filters):
+            lines.append(pad + 'v = %s(v, p)' % self._add_filter(flt))
+
+    def _generate_object(self, name, schema):
+        fields_name = 'FIELDS_%d' % len(self.constants)
+        self.constants.append('%s = frozenset(%r)' % (fields_name, sorted(schema['field_names'])))
+        lines = ['def %s(value, path):' % name,
+                 '    if value is None:',
+                 '        return None',
+                 '    if not isinstance(value, dict):',
+                 "        raise SchemaTypeError(path, 'not_object')",
+                 '    if not value.keys() <= %s:' % fields_name,
+                 "        raise SchemaValueError(path, 'unrecognized_field', list(set(value.keys()) - %s))" % fields_name,
+                 '    result = {}']
+        for field in schema['fields']:
+            field_name = field['name']
+            lines.append('    p = PathNode(path, %r)' % field_name)
+            lines.append('    v = value.get(%r)' % field_name)
+            self._emit_value(field['field_type'], field['filters'], lines, 4)
+            lines.append('    result[%r] = v' % field_name)
+        lines.append('    return result')
+        return lines
+
+    def _generate_array(self, name, schema):
+        lines = ['def %s(value, path):' % name,
+                 '    if value is None:',
+                 '        return None',
+                 '    if not isinstance(value, list):',
+                 "        raise SchemaTypeError(path, 'not_array')",
+                 '    result = []',
+                 '    for i, v in enumerate(value):',
+                 '        p = PathNode(path, i)']
+        self._emit_value(schema['element_type'], schema['filters'], lines, 8)
+        lines.append('        result.append(v)')
+        lines.append('    return result')
+        return lines
+
+    def _generate_either(self, name, schema):
+        lines = ['def %s(value, path):' % name,
+                 '    p = path']
+        for data_type in schema['types']:
+            lines.append('    try:')
+            lines.append('        v = value')
+            self._emit_value(data_type, (), lines, 8)
+            lines.append('        return v')
+            lines.append('    except (ValueError, TypeError):')
+            lines.append('        pass')
+        lines.append("    raise SchemaValueError(path, 'invalid_value')")
+        return lines
+
+    def _generate_tagged_union(self, name, schema):
+        table_name = 'BRANCHES_%d' % len(self.dispatch_tables)
+        self.dispatch_tables.append(None)
+        index = len(self.dispatch_tables) - 1
+        branches = ', '.join(['%r: %s' % (tag, self.generate(x)) for tag, x in schema['branches'].items()])
+        self.dispatch_tables[index] = '%s = {%s}' % (table_name, branches)
+        return ['def %s(value, path):' % name,
+                '    if value is None:',
+                '        return None',
+                '    if not isinstance(value, dict):',
+                "        raise SchemaTypeError(path, 'not_object')",
+                '    tag = value.get(%r)' % schema['tag'],
+                '    if isinstance(tag, (str, int, float, bool)) and tag in %s:' % table_name,
+                '        return %s[tag](value, path)' % table_name,
+                "    raise SchemaValueError(PathNode(path, %r), 'invalid_value', tuple(%s))" % (schema['tag'], table_name)]
+
+    def generate(self, schema):
+        schema = resolve_ref(schema)
+        if id(schema) in self.names:
+            return self.names[id(schema)]
+        schema_type = schema['type']
+        name = 'convert_%s_%d' % (schema_type.lower(), len(self.functions))
+        self.names[id(schema)] = name
+        self.functions.append(None)
+        index = len(self.functions) - 1
+        if schema_type == 'Object':
+            lines = self._generate_object(name, schema)
+        elif schema_type == 'Array':
+            lines = self._generate_array(name, schema)
+        elif schema_type == 'Either':
+            lines = self._generate_either(name, schema)
+        elif schema_type == 'TaggedUnion':
+            lines = self._generate_tagged_union(name, schema)
+        else:
+            lines = ['def %s(value, path):' % name,
+                     '    p = path',
+                     '    v = value']
+            self._emit_value(schema, (), lines, 4)
+            lines.append('    return v')
+        self.functions[index] = '\n'.join(lines)
+        return name
+
+
+def _generate(schema):
+    generator = _Generator()
+    entry = generator.generate(schema)
+    parts = [HEADER + FINGERPRINT_PREFIX + schema_fingerprint(schema)]
+    if generator.constants:
+        parts.append('\n'.join(generator.constants))
+    parts += generator.functions
+    if generator.dispatch_tables:
+        parts.append('\n'.join(generator.dispatch_tables))
+    parts.append('def convert(value, path=None):\n    return %s(value, path or [])' % entry)
+    return '\n\n\n'.join(parts) + '\n', generator.filters
+
+
+def generate_incoming_source(schema):
+    return _generate(schema)[0]
+
+
+def _load(source, filters, filename):
+    namespace = {
+        're': re,
+        'PathNode': PathNode,
+        'SchemaValueError': SchemaValueError,
+        'SchemaTypeError': SchemaTypeError,
+        'string_map': basic_type.string_map,
+    }
+    for i, flt in enumerate(filters):
+        namespace['filter_%d' % i] = flt.action
+    exec(compile(source, filename, 'exec'), namespace)
+    return namespace['convert']
+
+
+def compile_incoming_source(schema):
+    source, filters = _generate(schema)
+    return _load(source, filters, '<incoming_codegen>')
+
+
+def save_incoming_module(schema, filename):
+    with open(filename, 'w') as f:
+        f.write(generate_incoming_source(schema))
+
+
+def load_incoming_module(schema, filename):
+    with open(filename) as f:
+        source = f.read()
+    if FINGERPRINT_PREFIX + schema_fingerprint(schema) + '\n' not in source:
+        raise ValueError('Generated module does not match the schema: ' + filename)
+    return _load(source, _collect_filters(schema, [], set()), filename)
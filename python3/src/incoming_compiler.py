@@ -0,0 +1,353 @@
+import math
+import re
+
+from . import array_fastpath
+from . import basic_type
+from . import validators
+from .schema_dsl_common import *
+
+TYPE_CHECKS = {
+    'String': ('not isinstance(v, str)', 'not_string'),
+    'Integer': ('isinstance(v, bool) or not isinstance(v, int)', 'not_integer'),
+    'Number': ('isinstance(v, bool) or not isinstance(v, (int, float))', 'not_number'),
+    'Boolean': ('not isinstance(v, bool)', 'not_boolean'),
+}
+
+INLINE_CHECKS = {
+    validators.MaxLength: (('len(v) > {0}', 'too_long', 0),),
+    validators.MinLength: (('len(v) < {0}', 'too_short', 0),),
+    validators.LengthRange: (('len(v) < {0}', 'too_short', 0), ('len(v) > {1}', 'too_long', 1)),
+    validators.Minimum: (('v < {0}', 'too_small', 0),),
+    validators.ExclusiveMinimum: (('v <= {0}', 'too_small', 0),),
+    validators.Maximum: (('v > {0}', 'too_large', 0),),
+    validators.ExclusiveMaximum: (('v >= {0}', 'too_large', 0),),
+    validators.Range: (('v < {0}', 'too_small', 0), ('v > {1}', 'too_large', 1)),
+}
+
+MERGEABLE_PAIRS = {
+    (validators.MinLength, validators.MaxLength): validators.LengthRange,
+    (validators.Minimum, validators.Maximum): validators.Range
+}
+
+
+def _merge_pair(first, second):
+    for (low_factory, high_factory), factory in MERGEABLE_PAIRS.items():
+        if first.factory is low_factory and second.factory is high_factory:
+            low, high = first.params[0], second.params[0]
+        elif first.factory is high_factory and second.factory is low_factory:
+            low, high = second.params[0], first.params[0]
+        else:
+            continue
+        if low <= high:
+            return factory(low, high)
+    return None
+
+
+def merge_filters(filters):
+    result = []
+    for flt in filters:
+        merged = _merge_pair(result[-1], flt) if result else None
+        if merged is None:
+            result.append(flt)
+        else:
+            result[-1] = merged
+    return result
+
+
+def _is_literal(value):
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return value is None or type(value) in (bool, int, str)
+
+
+def _inline_validator(flt, constants, base):
+    if flt.factory in INLINE_CHECKS and all([_is_literal(x) for x in flt.params]):
+        return [(check.format(*[repr(x) for x in flt.params]), code, repr(flt.params[i]))
+                for check, code, i in INLINE_CHECKS[flt.factory]]
+    if flt.factory is validators.Only and all([_is_literal(x) for x in flt.params]):
+        name = 'OPTIONS_%d' % (base + len(constants))
+        constants.append('%s = frozenset(%r)' % (name, list(flt.params)))
+        return [('v not in ' + name, 'not_in_options', repr(flt.params))]
+    if flt.factory is validators.Pattern and isinstance(flt.params[0], str):
+        name = 'PATTERN_%d' % (base + len(constants))
+        constants.append('%s = re.compile(%r).match' % (name, flt.params[0]))
+        return [('%s(v) is None' % name, 'pattern_mismatch', repr(flt.params[0]))]
+    return None
+
+
+def inline_pipeline(schema, filters, constants, indent):
+    if schema['type'] not in TYPE_CHECKS:
+        return None
+    pad = ' ' * indent
+    type_check, type_code = TYPE_CHECKS[schema['type']]
+    not_null = False
+    checks = []
+    pipeline_constants = []
+    for flt in merge_filters(filters):
+        if flt.action is validators._not_null:
+            not_null = True
+            continue
+        if flt.action is validators._not_empty:
+            not_null = True
+            checks.append(("v == ''", 'empty', None))
+            continue
+        flt_checks = _inline_validator(flt, pipeline_constants, len(constants))
+        if flt_checks is None:
+            return None
+        checks += flt_checks
+    if not_null:
+        lines = [pad + 'if v is None:',
+                 pad + "    raise SchemaValueError(p, 'not_null')",
+                 pad + 'else:']
+    else:
+        lines = [pad + 'if v is not None:']
+    lines += [pad + '    if %s:' % type_check,
+              pad + '        raise SchemaTypeError(p, %r)' % type_code]
+    for check, code, constraint in checks:
+        lines.append(pad + '    if %s:' % check)
+        if constraint is None:
+            lines.append(pad + '        raise SchemaValueError(p, %r)' % code)
+        else:
+            lines.append(pad + '        raise SchemaValueError(p, %r, %s)' % (code, constraint))
+    constants += pipeline_constants
+    return lines
+
+
+def _compile_pipeline(schema, filters):
+    constants = []
+    lines = inline_pipeline(schema, filters, constants, 4)
+    if lines is None:
+        return None
+    source = '\n'.join(constants + ['def pipeline(v, p):'] + lines + ['    return v'])
+    namespace = {'re': re, 'SchemaValueError': SchemaValueError, 'SchemaTypeError': SchemaTypeError}
+    exec(compile(source, '<incoming_compiler>', 'exec'), namespace)
+    return namespace['pipeline']
+
+
+def compile_chain(schema, filters, options):
+    return _compile_pipeline(schema, filters) or fuse_chain(_compile(schema, options), filters)
+
+
+def fuse_chain(converter, filters):
+    actions = tuple([flt.action for flt in merge_filters(filters)])
+    if not actions:
+        return converter
+    if len(actions) == 1:
+        action = actions[0]
+
+        def f(value, path):
+            return action(converter(value, path), path)
+
+        return f
+
+    def f(value, path):
+        value = converter(value, path)
+        for action in actions:
+            value = action(value, path)
+        return value
+
+    return f
+
+
+def _compile_field(field, options):
+    name = field['name']
+    chain = compile_chain(field['field_type'], field['filters'], options)
+
+    def f(input_object, parent):
+        return chain(input_object.get(name), PathNode(parent, name))
+
+    return name, f
+
+
+def _compile_object(schema, options):
+    field_name_set = schema['field_names']
+    fields = tuple([_compile_field(field, options) for field in schema['fields']])
+
+    def f(input_object, path):
+        if input_object is None:
+            return None
+        if not isinstance(input_object, dict):
+            raise SchemaTypeError(path, 'not_object')
+        if not input_object.keys() <= field_name_set:
+            raise SchemaValueError(path, 'unrecognized_field', list(set(input_object.keys()) - field_name_set))
+        return {name: field_converter(input_object, path) for name, field_converter in fields}
+
+    if options.get('passthrough'):
+        return _passthrough_object(f, fields, field_name_set)
+    return f
+
+
+def _passthrough_object(converter, fields, field_name_set):
+    def f(input_object, path):
+        if not isinstance(input_object, dict) or len(input_object) != len(fields) or \
+                not input_object.keys() <= field_name_set:
+            return converter(input_object, path)
+        for i, (name, field_converter) in enumerate(fields):
+            value = field_converter(input_object, path)
+            if value is not input_object[name]:
+                result = {x: input_object[x] for x, _ in fields[:i]}
+                result[name] = value
+                for x, remaining_converter in fields[i + 1:]:
+                    result[x] = remaining_converter(input_object, path)
+                return result
+        return input_object
+
+    return f
+
+
+def _passthrough_array(element):
+    def f(input_object, path):
+        if input_object is None:
+            return None
+        if not isinstance(input_object, list):
+            raise SchemaTypeError(path, 'not_array')
+        for i in range(len(input_object)):
+            value = element(input_object[i], PathNode(path, i))
+            if value is not input_object[i]:
+                result = input_object[:i]
+                result.append(value)
+                result += [element(input_object[j], PathNode(path, j)) for j in range(i + 1, len(input_object))]
+                return result
+        return input_object
+
+    return f
+
+
+def _compile_array(schema, options):
+    element = compile_chain(schema['element_type'], schema['filters'], options)
+
+    def f(input_object, path):
+        if input_object is None:
+            return None
+        if not isinstance(input_object, list):
+            raise SchemaTypeError(path, 'not_array')
+        return [element(input_object[i], PathNode(path, i)) for i in range(len(input_object))]
+
+    passthrough = options.get('passthrough')
+    if passthrough:
+        f = _passthrough_array(element)
+    if options.get('numpy_arrays'):
+        f = array_fastpath.numeric_array(schema, f, element, options.get('as_ndarray'), passthrough) or f
+    return array_fastpath.string_array(schema, f, merge_filters(schema['filters']), passthrough) or f
+
+
+JSON_TYPES = (str, int, float, bool, dict, list)
+
+ACCEPTED_TYPES = {
+    'String': (str,),
+    'Integer': (int,),
+    'Number': (int, float),
+    'Boolean': (bool,),
+    'StringMap': (dict,),
+    'Object': (dict,),
+    'Array': (list,),
+    'TaggedUnion': (dict,)
+}
+
+SCALAR_TYPES = (str, int, float, bool)
+
+
+def _accepts(schema, json_type):
+    schema = resolve_ref(schema)
+    if schema['type'] == 'Either':
+        return any([_accepts(x, json_type) for x in schema['types']])
+    return json_type in ACCEPTED_TYPES.get(schema['type'], JSON_TYPES)
+
+
+def _get_tags(schema):
+    schema = resolve_ref(schema)
+    if schema['type'] != 'Object':
+        return ()
+    tags = []
+    for field in schema['fields']:
+        if field['field_type']['type'] not in ('String', 'Integer', 'Number', 'Boolean'):
+            continue
+        for flt in field['filters']:
+            if flt.filter_type != 'validator':
+                break
+            if flt.name == 'Only':
+                tags.append((field['name'], frozenset(flt.params)))
+                break
+    return tuple(tags)
+
+
+def _tags_match(tags, input_object):
+    for name, options in tags:
+        value = input_object.get(name)
+        if value is not None and (not isinstance(value, SCALAR_TYPES) or value not in options):
+            return False
+    return True
+
+
+def _compile_either(schema, options):
+    branches = tuple([(_compile(x, options), _get_tags(x)) for x in schema['types']])
+    dispatch = {}
+    for json_type in JSON_TYPES:
+        dispatch[json_type] = tuple([branches[i] for i, x in enumerate(schema['types']) if _accepts(x, json_type)])
+    tagged = any([tags for converter, tags in branches])
+
+    def f(input_object, path):
+        if input_object is None:
+            return None
+        candidates = dispatch.get(type(input_object), branches)
+        if tagged and type(input_object) is dict:
+            candidates = [x for x in candidates if _tags_match(x[1], input_object)]
+        for converter, tags in candidates:
+            try:
+                return converter(input_object, path)
+            except (ValueError, TypeError):
+                pass
+        raise SchemaValueError(path, 'invalid_value')
+
+    return f
+
+
+def _compile_tagged_union(schema, options):
+    tag_name = schema['tag']
+    branches = {tag: _compile(branch, options) for tag, branch in schema['branches'].items()}
+    tag_options = tuple(branches)
+
+    def f(input_object, path):
+        if input_object is None:
+            return None
+        if not isinstance(input_object, dict):
+            raise SchemaTypeError(path, 'not_object')
+        tag = input_object.get(tag_name)
+        if isinstance(tag, SCALAR_TYPES) and tag in branches:
+            return branches[tag](input_object, path)
+        raise SchemaValueError(PathNode(path, tag_name), 'invalid_value', tag_options)
+
+    return f
+
+
+COMPILER_MAP = {
+    'String': lambda schema, options: basic_type.string_type,
+    'Integer': lambda schema, options: basic_type.integer_type,
+    'Number': lambda schema, options: basic_type.number_type,
+    'Boolean': lambda schema, options: basic_type.boolean_type,
+    'StringMap': lambda schema, options: basic_type.string_map,
+    'Object': _compile_object,
+    'Array': _compile_array,
+    'Either': _compile_either,
+    'TaggedUnion': _compile_tagged_union
+}
+
+
+def _compile_schema(schema, options):
+    return COMPILER_MAP[schema['type']](schema, options)
+
+
+def _compile(schema, options):
+    return compile_shared(schema, options, _compile_schema)
+
+
+def compile_incoming(schema, numpy_arrays=False, as_ndarray=False, passthrough=False):
+    if numpy_arrays and array_fastpath.numpy is None:
+        raise ImportError('numpy is required for numpy_arrays')
+    options = {'numpy_arrays': numpy_arrays, 'as_ndarray': as_ndarray, 'passthrough': passthrough}
+    converter = _compile(schema, options)
+
+    def convert(input_object, path=None):
+        return converter(input_object, path or [])
+
+    return convert
@@ -1,26 +1,20 @@
 import functools
 
 from . import basic_type
+from .incoming_compiler import compile_incoming
 from .schema_dsl_common import *
 
+_CONVERTERS = {}
+
 
 def _check_object_type(input_object, path):
     if not isinstance(input_object, dict):
-        raise TypeError(get_message(path, 'Should be an object'))
-
-
-def _get_unrecognized_message(diff_set):
-    diff = list(diff_set)
-    if len(diff) == 1:
-        return 'Unrecognized field: ' + diff[0]
-    return 'Unrecognized fields: ' + ', '.join([x for x in diff])
+        raise SchemaTypeError(path, 'not_object')
 
 
 def _check_redundancy(input_object, path, field_name_set):
-    input_key_set = set(input_object.keys())
-    if not input_key_set <= field_name_set:
-        msg = _get_unrecognized_message(input_key_set - field_name_set)
-        raise ValueError(get_message(path, msg))
+    if not input_object.keys() <= field_name_set:
+        raise SchemaValueError(path, 'unrecognized_field', list(set(input_object.keys()) - field_name_set))
 
 
 def _validate_incoming_object(input_object, path, field_name_set):
@@ -31,7 +25,7 @@ def _validate_incoming_object(input_object, path, field_name_set):
 
 
 def _process_field(field, parent, input_object):
-    path = parent + [field['name']]
+    path = PathNode(parent, field['name'])
     result = convert(field['field_type'], input_object, path)
     return functools.reduce(lambda res, f: f(res, path), field['filters'], result)
 
@@ -49,8 +43,7 @@ def _collect_object_result(input_object, path, fields):
 
 def _convert_object(schema, input_object, path):
     path = path or []
-    field_name_set = set([x['name'] for x in schema['fields']])
-    _validate_incoming_object(input_object, path, field_name_set)
+    _validate_incoming_object(input_object, path, schema['field_names'])
     if input_object is None:
         return None
     return _collect_object_result(input_object, path, schema['fields'])
@@ -58,7 +51,7 @@ def _convert_object(schema, input_object, path):
 
 def _check_array_type(input_object, path):
     if not isinstance(input_object, list):
-        raise TypeError(get_message(path, 'Should be an array'))
+        raise SchemaTypeError(path, 'not_array')
 
 
 def _validate_array(input_object, path):
@@ -73,7 +66,7 @@ def _filter_array_element(input_object, path, element_type, filters):
 
 
 def _collect_array_result(input_object, path, element_type, filters):
-    return [_filter_array_element(input_object[i], path + [str(i)], element_type, filters) for i in
+    return [_filter_array_element(input_object[i], PathNode(path, i), element_type, filters) for i in
             range(len(input_object))]
 
 
@@ -93,7 +86,18 @@ def _convert_either(schema, input_object, path):
             pass
         except TypeError:
             pass
-    raise ValueError(get_message(path, 'Invalid value'))
+    raise SchemaValueError(path, 'invalid_value')
+
+
+def _convert_tagged_union(schema, input_object, path):
+    if input_object is None:
+        return None
+    _check_object_type(input_object, path)
+    return convert(get_tagged_branch(schema, input_object, path), input_object, path)
+
+
+def _convert_ref(schema, input_object, path):
+    return convert(resolve_ref(schema), input_object, path)
 
 
 def _schema_wrap(converter):
@@ -111,10 +115,193 @@ TYPE_FUNCTION_MAP = {
     'StringMap': _schema_wrap(basic_type.string_map),
     'Object': _convert_object,
     'Array': _convert_array,
-    'Either': _convert_either
+    'Either': _convert_either,
+    'TaggedUnion': _convert_tagged_union,
+    'Ref': _convert_ref
+}
+
+
+def _convert_object_in_place(schema, input_object, path):
+    _validate_incoming_object(input_object, path, schema['field_names'])
+    if input_object is None:
+        return None
+    for field in schema['fields']:
+        field_path = PathNode(path, field['name'])
+        result = _convert_in_place(field['field_type'], input_object.get(field['name']), field_path)
+        input_object[field['name']] = functools.reduce(lambda res, f: f(res, field_path), field['filters'], result)
+    return input_object
+
+
+def _convert_array_in_place(schema, input_object, path):
+    _validate_array(input_object, path)
+    if input_object is None:
+        return None
+    for i in range(len(input_object)):
+        element_path = PathNode(path, i)
+        result = _convert_in_place(schema['element_type'], input_object[i], element_path)
+        input_object[i] = functools.reduce(lambda res, f: f(res, element_path), schema['filters'], result)
+    return input_object
+
+
+def _convert_tagged_union_in_place(schema, input_object, path):
+    if input_object is None:
+        return None
+    _check_object_type(input_object, path)
+    return _convert_object_in_place(get_tagged_branch(schema, input_object, path), input_object, path)
+
+
+def _convert_ref_in_place(schema, input_object, path):
+    return _convert_in_place(resolve_ref(schema), input_object, path)
+
+
+IN_PLACE_FUNCTION_MAP = {
+    'Object': _convert_object_in_place,
+    'Array': _convert_array_in_place,
+    'TaggedUnion': _convert_tagged_union_in_place,
+    'Ref': _convert_ref_in_place
 }
 
 
-def convert(schema, input_object, path=None):
+def _convert_in_place(schema, input_object, path):
+    if schema['type'] in IN_PLACE_FUNCTION_MAP:
+        return IN_PLACE_FUNCTION_MAP[schema['type']](schema, input_object, path)
+    return TYPE_FUNCTION_MAP[schema['type']](schema, input_object, path)
+
+
+def convert(schema, input_object, path=None, in_place=False):
     path = path or []
+    if in_place:
+        return _convert_in_place(schema, input_object, path)
     return TYPE_FUNCTION_MAP[schema['type']](schema, input_object, path)
+
+
+def convert_many(schema, records):
+    converter = compile_cached(schema, _CONVERTERS, compile_incoming)
+    results = []
+    errors = []
+    for i, record in enumerate(records):
+        try:
+            results.append(converter(record))
+        except (ValueError, TypeError) as ex:
+            results.append(None)
+            errors.append((i, ex))
+    return results, errors
+
+
+DEFAULT_MAX_ERRORS = 100
+
+_INVALID = object()
+
+
+class _ErrorBudgetExceeded(Exception):
+    pass
+
+
+def _add_error(errors, max_errors, path, ex):
+    if isinstance(ex, SchemaValidationError):
+        errors.append(FieldError(ex.path, ex.code, ex.message))
+    else:
+        errors.append(FieldError(get_path_tuple(path), 'invalid', str(ex)))
+    if len(errors) >= max_errors:
+        raise _ErrorBudgetExceeded()
+
+
+def _collect_filters(value, path, filters, errors, max_errors):
+    if value is _INVALID:
+        return _INVALID
+    for f in filters:
+        try:
+            value = f(value, path)
+        except (ValueError, TypeError) as ex:
+            _add_error(errors, max_errors, path, ex)
+            return _INVALID
+    return value
+
+
+def _collect_object(schema, input_object, path, errors, max_errors):
+    if not isinstance(input_object, dict):
+        _add_error(errors, max_errors, path, SchemaTypeError(path, 'not_object'))
+        return _INVALID
+    field_name_set = schema['field_names']
+    if not input_object.keys() <= field_name_set:
+        unrecognized = list(set(input_object.keys()) - field_name_set)
+        _add_error(errors, max_errors, path, SchemaValueError(path, 'unrecognized_field', unrecognized))
+    result = {}
+    for field in schema['fields']:
+        field_path = PathNode(path, field['name'])
+        value = _collect(field['field_type'], input_object.get(field['name']), field_path, errors, max_errors)
+        value = _collect_filters(value, field_path, field['filters'], errors, max_errors)
+        result[field['name']] = None if value is _INVALID else value
+    return result
+
+
+def _collect_array(schema, input_object, path, errors, max_errors):
+    if not isinstance(input_object, list):
+        _add_error(errors, max_errors, path, SchemaTypeError(path, 'not_array'))
+        return _INVALID
+    result = []
+    for i in range(len(input_object)):
+        element_path = PathNode(path, i)
+        value = _collect(schema['element_type'], input_object[i], element_path, errors, max_errors)
+        value = _collect_filters(value, element_path, schema['filters'], errors, max_errors)
+        result.append(None if value is _INVALID else value)
+    return result
+
+
+def _collect_string_map(schema, input_object, path, errors, max_errors):
+    if not isinstance(input_object, dict):
+        _add_error(errors, max_errors, path, SchemaTypeError(path, 'not_object'))
+        return _INVALID
+    for k, v in input_object.items():
+        if not isinstance(v, str):
+            _add_error(errors, max_errors, path, SchemaTypeError(path + [k], 'not_string'))
+    return input_object
+
+
+def _collect_tagged_union(schema, input_object, path, errors, max_errors):
+    if not isinstance(input_object, dict):
+        _add_error(errors, max_errors, path, SchemaTypeError(path, 'not_object'))
+        return _INVALID
+    try:
+        branch = get_tagged_branch(schema, input_object, path)
+    except ValueError as ex:
+        _add_error(errors, max_errors, path, ex)
+        return _INVALID
+    return _collect_object(branch, input_object, path, errors, max_errors)
+
+
+def _collect_ref(schema, input_object, path, errors, max_errors):
+    return _collect(resolve_ref(schema), input_object, path, errors, max_errors)
+
+
+COLLECT_FUNCTION_MAP = {
+    'Object': _collect_object,
+    'Array': _collect_array,
+    'StringMap': _collect_string_map,
+    'TaggedUnion': _collect_tagged_union,
+    'Ref': _collect_ref
+}
+
+
+def _collect(schema, input_object, path, errors, max_errors):
+    if input_object is None:
+        return None
+    if schema['type'] in COLLECT_FUNCTION_MAP:
+        return COLLECT_FUNCTION_MAP[schema['type']](schema, input_object, path, errors, max_errors)
+    try:
+        return convert(schema, input_object, path)
+    except (ValueError, TypeError) as ex:
+        _add_error(errors, max_errors, path, ex)
+        return _INVALID
+
+
+def collect_errors(schema, input_object, path=None, max_errors=DEFAULT_MAX_ERRORS):
+    path = path or []
+    errors = []
+    try:
+        result = _collect(schema, input_object, path, errors, max_errors)
+    except _ErrorBudgetExceeded:
+        pass
+    if errors:
+        return None, errors
+    return result, errors
@@ -0,0 +1,237 @@
+from . import basic_type
+from .outgoing_compiler import skips_missing
+from .schema_dsl_common import *
+
+DEFAULT_MAX_DEPTH = 1000
+
+_PENDING = object()
+
+
+class _Frame:
+    __slots__ = ('schema', 'value', 'path', 'depth', 'index', 'result')
+
+    def __init__(self, schema, value, path, depth, result):
+        self.schema = schema
+        self.value = value
+        self.path = path
+        self.depth = depth
+        self.index = -1
+        self.result = result
+
+    def finish(self):
+        return self.result
+
+
+class _IncomingObjectFrame(_Frame):
+    __slots__ = ()
+
+    def next_child(self):
+        fields = self.schema['fields']
+        while True:
+            self.index += 1
+            if self.index == len(fields):
+                return None
+            field = fields[self.index]
+            field_type = field['field_type']
+            path = PathNode(self.path, field['name'])
+            if field_type['type'] not in INCOMING_SCALARS:
+                return field_type, self.value.get(field['name']), path
+            value = INCOMING_SCALARS[field_type['type']](self.value.get(field['name']), path)
+            for f in field['filters']:
+                value = f(value, path)
+            self.result[field['name']] = value
+
+    def deliver(self, value):
+        field = self.schema['fields'][self.index]
+        path = PathNode(self.path, field['name'])
+        for f in field['filters']:
+            value = f(value, path)
+        self.result[field['name']] = value
+
+
+class _IncomingArrayFrame(_Frame):
+    __slots__ = ()
+
+    def next_child(self):
+        element_type = self.schema['element_type']
+        while True:
+            self.index += 1
+            if self.index == len(self.value):
+                return None
+            path = PathNode(self.path, self.index)
+            if element_type['type'] not in INCOMING_SCALARS:
+                return element_type, self.value[self.index], path
+            value = INCOMING_SCALARS[element_type['type']](self.value[self.index], path)
+            for f in self.schema['filters']:
+                value = f(value, path)
+            self.result.append(value)
+
+    def deliver(self, value):
+        path = PathNode(self.path, self.index)
+        for f in self.schema['filters']:
+            value = f(value, path)
+        self.result.append(value)
+
+
+class _EitherFrame(_Frame):
+    __slots__ = ()
+
+    def next_child(self):
+        if self.result is not _PENDING:
+            return None
+        self.index += 1
+        return self.schema['types'][self.index], self.value, self.path
+
+    def deliver(self, value):
+        self.result = value
+
+    def retry(self):
+        return self.result is _PENDING and self.index + 1 < len(self.schema['types'])
+
+
+class _OutgoingObjectFrame(_Frame):
+    __slots__ = ()
+
+    def next_child(self):
+        fields = self.schema['fields']
+        while True:
+            self.index += 1
+            if self.index == len(fields):
+                return None
+            field = fields[self.index]
+            name = field['name']
+            if name not in self.value and skips_missing(field['filters']):
+                continue
+            path = PathNode(self.path, name)
+            value = self.value.get(name)
+            for f in field['filters']:
+                value = f(value, path)
+            field_type = field['field_type']
+            if field_type['type'] not in OUTGOING_SCALARS:
+                return field_type, value, path
+            self.deliver(OUTGOING_SCALARS[field_type['type']](value, path))
+
+    def deliver(self, value):
+        name = self.schema['fields'][self.index]['name']
+        if value is not None or name in self.value:
+            self.result[name] = value
+
+
+class _OutgoingArrayFrame(_Frame):
+    __slots__ = ()
+
+    def next_child(self):
+        element = next(self.value, _PENDING)
+        if element is _PENDING:
+            return None
+        self.index += 1
+        path = PathNode(self.path, self.index)
+        for f in self.schema['filters']:
+            element = f(element, path)
+        return self.schema['element_type'], element, path
+
+    def deliver(self, value):
+        self.result.append(value)
+
+
+def _push(stack, frame_type, schema, value, path, result, max_depth):
+    depth = stack[-1].depth + 1 if stack else 1
+    if max_depth is not None and depth > max_depth:
+        raise SchemaValueError(path, 'too_deep', max_depth)
+    stack.append(frame_type(schema, value, path, depth, result))
+    return _PENDING
+
+
+def _begin_incoming(schema, value, path, stack, max_depth):
+    schema = resolve_ref(schema)
+    schema_type = schema['type']
+    if schema_type in INCOMING_SCALARS:
+        return INCOMING_SCALARS[schema_type](value, path)
+    if schema_type == 'Either':
+        depth = stack[-1].depth if stack else 0
+        stack.append(_EitherFrame(schema, value, path, depth, _PENDING))
+        return _PENDING
+    if value is None:
+        return None
+    if schema_type == 'Array':
+        if not isinstance(value, list):
+            raise SchemaTypeError(path, 'not_array')
+        return _push(stack, _IncomingArrayFrame, schema, value, path, [], max_depth)
+    if not isinstance(value, dict):
+        raise SchemaTypeError(path, 'not_object')
+    if schema_type == 'TaggedUnion':
+        schema = get_tagged_branch(schema, value, path)
+    if not value.keys() <= schema['field_names']:
+        raise SchemaValueError(path, 'unrecognized_field', list(set(value.keys()) - schema['field_names']))
+    return _push(stack, _IncomingObjectFrame, schema, value, path, {}, max_depth)
+
+
+def _begin_outgoing(schema, value, path, stack, max_depth):
+    schema = resolve_ref(schema)
+    schema_type = schema['type']
+    if schema_type in OUTGOING_SCALARS:
+        return OUTGOING_SCALARS[schema_type](value, path)
+    if value is None:
+        return None
+    if schema_type == 'Array':
+        if not basic_type.is_array(value):
+            raise SchemaTypeError(path, 'not_array')
+        return _push(stack, _OutgoingArrayFrame, schema, iter(value), path, [], max_depth)
+    if not isinstance(value, dict):
+        raise SchemaTypeError(path, 'not_object')
+    if schema_type == 'TaggedUnion':
+        schema = get_tagged_branch(schema, value, path)
+    return _push(stack, _OutgoingObjectFrame, schema, value, path, {}, max_depth)
+
+
+INCOMING_SCALARS = {
+    'String': basic_type.string_type,
+    'Integer': basic_type.integer_type,
+    'Number': basic_type.number_type,
+    'Boolean': basic_type.boolean_type,
+    'StringMap': basic_type.string_map
+}
+
+OUTGOING_SCALARS = dict(INCOMING_SCALARS, Any=basic_type.any_type)
+
+
+def _recover(stack, ex):
+    if isinstance(ex, SchemaValidationError) and ex.code == 'too_deep':
+        raise ex
+    while stack:
+        frame = stack.pop()
+        if isinstance(frame, _EitherFrame) and frame.result is _PENDING:
+            if frame.retry():
+                stack.append(frame)
+                return _PENDING
+            ex = SchemaValueError(frame.path, 'invalid_value')
+    raise ex
+
+
+def _run(begin, schema, value, path, max_depth):
+    stack = []
+    value = begin(schema, value, path, stack, max_depth)
+    while stack:
+        frame = stack[-1]
+        try:
+            if value is not _PENDING:
+                frame.deliver(value)
+                value = _PENDING
+                continue
+            child = frame.next_child()
+            if child is None:
+                stack.pop()
+                value = frame.finish()
+            else:
+                value = begin(child[0], child[1], child[2], stack, max_depth)
+        except (ValueError, TypeError) as ex:
+            value = _recover(stack, ex)
+    return value
+
+
+def convert_incoming(schema, input_object, path=None, max_depth=DEFAULT_MAX_DEPTH):
+    return _run(_begin_incoming, schema, input_object, path or [], max_depth)
+
+
+def convert_outgoing(schema, input_object, path=None, max_depth=DEFAULT_MAX_DEPTH):
+    return _run(_begin_outgoing, schema, input_object, path or [], max_depth)
@@ -1,12 +1,16 @@
 import functools
+import random
 
 from . import basic_type
+from .outgoing_compiler import compile_outgoing
 from .schema_dsl_common import *
 
+_CONVERTERS = {}
+
 
 def _check_object_type(input_object, path):
     if not isinstance(input_object, dict):
-        raise TypeError(get_message(path, 'Should be an object'))
+        raise SchemaTypeError(path, 'not_object')
 
 
 def _validate_outgoing_object(input_object, path):
@@ -16,7 +20,7 @@ def _validate_outgoing_object(input_object, path):
 
 
 def _process_field(field, parent, input_object):
-    path = parent + [field['name']]
+    path = PathNode(parent, field['name'])
     result = functools.reduce(lambda res, f: f(res, path), field['filters'], input_object)
     return convert(field['field_type'], result, path)
 
@@ -43,8 +47,8 @@ def _convert_object(schema, input_object, path):
 
 
 def _check_array_type(input_object, path):
-    if not isinstance(input_object, list):
-        raise TypeError(get_message(path, 'Should be an array'))
+    if not basic_type.is_array(input_object):
+        raise SchemaTypeError(path, 'not_array')
 
 
 def _validate_array(input_object, path):
@@ -59,8 +63,8 @@ def _filter_array_element(input_object, path, element_type, filters):
 
 
 def _collect_array_result(input_object, path, element_type, filters):
-    return [_filter_array_element(input_object[i], path + [str(i)], element_type, filters) for i in
-            range(len(input_object))]
+    return [_filter_array_element(element, PathNode(path, i), element_type, filters) for i, element in
+            enumerate(input_object)]
 
 
 def _convert_array(schema, input_object, path):
@@ -71,6 +75,18 @@ def _convert_array(schema, input_object, path):
     return _collect_array_result(input_object, path, schema['element_type'], schema['filters'])
 
 
+def _convert_tagged_union(schema, input_object, path):
+    path = path or []
+    _validate_outgoing_object(input_object, path)
+    if input_object is None:
+        return None
+    return convert(get_tagged_branch(schema, input_object, path), input_object, path)
+
+
+def _convert_ref(schema, input_object, path):
+    return convert(resolve_ref(schema), input_object, path)
+
+
 def _schema_wrap(converter):
     def f(schema, input_object, path):
         return converter(input_object, path)
@@ -86,9 +102,98 @@ TYPE_FUNCTION_MAP = {
     'Boolean': _schema_wrap(basic_type.boolean_type),
     'StringMap': _schema_wrap(basic_type.string_map),
     'Object': _convert_object,
-    'Array': _convert_array
+    'Array': _convert_array,
+    'TaggedUnion': _convert_tagged_union,
+    'Ref': _convert_ref
+}
+
+
+TRUSTED_TYPES = frozenset(['Any', 'String', 'Integer', 'Number', 'Boolean', 'StringMap'])
+
+
+def _process_trusted_field(field, parent, input_object):
+    if not field['filters'] and field['field_type']['type'] in TRUSTED_TYPES:
+        return input_object
+    path = PathNode(parent, field['name'])
+    result = functools.reduce(lambda res, f: f(res, path), field['filters'], input_object)
+    return _convert_trusted(field['field_type'], result, path)
+
+
+def _convert_trusted_object(schema, input_object, path):
+    if input_object is None:
+        return None
+    result = {}
+    for field in schema['fields']:
+        field_name = field['name']
+        if field_name in input_object:
+            result[field_name] = _process_trusted_field(field, path, input_object[field_name])
+        elif field['filters']:
+            field_result = _process_trusted_field(field, path, None)
+            if field_result is not None:
+                result[field_name] = field_result
+    return result
+
+
+def _convert_trusted_array(schema, input_object, path):
+    if input_object is None:
+        return None
+    element_type = schema['element_type']
+    filters = schema['filters']
+    if not filters and element_type['type'] in TRUSTED_TYPES:
+        return list(input_object)
+    result = []
+    for i, element in enumerate(input_object):
+        element_path = PathNode(path, i)
+        element = functools.reduce(lambda res, f: f(res, element_path), filters, element)
+        result.append(_convert_trusted(element_type, element, element_path))
+    return result
+
+
+def _convert_trusted_tagged_union(schema, input_object, path):
+    if input_object is None:
+        return None
+    return _convert_trusted_object(get_tagged_branch(schema, input_object, path), input_object, path)
+
+
+def _convert_trusted_ref(schema, input_object, path):
+    return _convert_trusted(resolve_ref(schema), input_object, path)
+
+
+TRUSTED_FUNCTION_MAP = {
+    'Object': _convert_trusted_object,
+    'Array': _convert_trusted_array,
+    'TaggedUnion': _convert_trusted_tagged_union,
+    'Ref': _convert_trusted_ref
 }
 
 
-def convert(schema, input_object, path=None):
+def _convert_trusted(schema, input_object, path):
+    if schema['type'] in TRUSTED_TYPES:
+        return input_object
+    return TRUSTED_FUNCTION_MAP[schema['type']](schema, input_object, path)
+
+
+def _sample(check_rate):
+    return check_rate > 0 and random.random() < check_rate
+
+
+def convert(schema, input_object, path=None, trusted=False, check_rate=0.0):
+    if trusted and not _sample(check_rate):
+        return _convert_trusted(schema, input_object, path or [])
     return TYPE_FUNCTION_MAP[schema['type']](schema, input_object, path)
+
+
+def convert_many(schema, records, trusted=False, check_rate=0.0):
+    converter = compile_cached(schema, _CONVERTERS, compile_outgoing)
+    results = []
+    errors = []
+    for i, record in enumerate(records):
+        try:
+            if trusted and not _sample(check_rate):
+                results.append(_convert_trusted(schema, record, []))
+            else:
+                results.append(converter(record))
+        except (ValueError, TypeError) as ex:
+            results.append(None)
+            errors.append((i, ex))
+    return results, errors
@@ -0,0 +1,23 @@
+import multiprocessing
+
+from .incoming_compiler import compile_incoming
+
+_converter = None
+
+
+def _init_worker(schema):
+    global _converter
+    _converter = compile_incoming(schema)
+
+
+def _convert(record):
+    try:
+        return _converter(record)
+    except (ValueError, TypeError) as ex:
+        return ex
+
+
+def parallel_convert(schema, iterable, workers=None, chunksize=256):
+    with multiprocessing.Pool(workers, _init_worker, (schema,)) as pool:
+        for result in pool.imap(_convert, iterable, chunksize):
+            yield result
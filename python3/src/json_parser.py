@@ -0,0 +1,209 @@
+import json
+
+from .incoming_compiler import compile_chain, fuse_chain
+from .outgoing_compiler import skips_missing
+from .schema_dsl_common import *
+
+WHITESPACE = json.decoder.WHITESPACE
+WHITESPACE_CHARS = ' \t\n\r'
+scanstring = json.decoder.scanstring
+_scanner = json.scanner.make_scanner(json.JSONDecoder())
+
+DEFAULT_FUSE_THRESHOLD = 65536
+
+_MISSING = object()
+_PARSERS = {}
+
+
+def _skip(s, end):
+    if s[end:end + 1] not in WHITESPACE_CHARS:
+        return end
+    if s[end + 1:end + 2] not in WHITESPACE_CHARS:
+        return end + 1
+    return WHITESPACE.match(s, end).end()
+
+
+def _scan(s, end):
+    try:
+        return _scanner(s, end)
+    except StopIteration as err:
+        raise json.JSONDecodeError('Expecting value', s, err.value) from None
+
+
+def _identity(value, path):
+    return value
+
+
+def _compile_scanned(schema, filters, options):
+    chain = compile_chain(schema, filters, options)
+
+    def f(s, end, path):
+        try:
+            value, end = _scanner(s, end)
+        except StopIteration as err:
+            raise json.JSONDecodeError('Expecting value', s, err.value) from None
+        return chain(value, path), end
+
+    return f
+
+
+def _is_leaf(schema):
+    schema = resolve_ref(schema)
+    if schema['type'] == 'Object':
+        return all([resolve_ref(x['field_type'])['type'] not in PARSER_MAP for x in schema['fields']])
+    if schema['type'] == 'Array':
+        return resolve_ref(schema['element_type'])['type'] not in PARSER_MAP
+    return schema['type'] not in PARSER_MAP
+
+
+def _compile_parser(schema, options):
+    return PARSER_MAP[schema['type']](schema, options)
+
+
+def _compile_value(schema, filters, options):
+    if _is_leaf(schema):
+        return _compile_scanned(schema, filters, options)
+    parser = compile_shared(schema, options, _compile_parser)
+    post = fuse_chain(_identity, filters)
+    if post is _identity:
+        return parser
+
+    def f(s, end, path):
+        value, end = parser(s, end, path)
+        return post(value, path), end
+
+    return f
+
+
+def _compile_object(schema, options):
+    fields = {}
+    defaults = {}
+    required = []
+    for field in schema['fields']:
+        name = field['name']
+        chain = compile_chain(field['field_type'], field['filters'], options)
+        if _is_leaf(field['field_type']):
+            fields[name] = chain, None
+        else:
+            fields[name] = None, _compile_value(field['field_type'], field['filters'], options)
+        if skips_missing(field['filters']):
+            defaults[name] = None
+        else:
+            defaults[name] = _MISSING
+            required.append((name, chain))
+    required = tuple(required)
+
+    def f(s, end, path):
+        if s.startswith('null', end):
+            return None, end + 4
+        if s[end:end + 1] != '{':
+            _scan(s, end)
+            raise SchemaTypeError(path, 'not_object')
+        result = defaults.copy()
+        end = _skip(s, end + 1)
+        if s[end:end + 1] == '}':
+            end += 1
+        else:
+            while True:
+                if s[end:end + 1] != '"':
+                    raise json.JSONDecodeError('Expecting property name enclosed in double quotes', s, end)
+                key, end = scanstring(s, end + 1)
+                if s[end:end + 1] != ':':
+                    end = _skip(s, end)
+                    if s[end:end + 1] != ':':
+                        raise json.JSONDecodeError("Expecting ':' delimiter", s, end)
+                if key not in fields:
+                    raise SchemaValueError(path, 'unrecognized_field', [key])
+                chain, parser = fields[key]
+                end = _skip(s, end + 1)
+                if parser is None:
+                    try:
+                        value, end = _scanner(s, end)
+                    except StopIteration as err:
+                        raise json.JSONDecodeError('Expecting value', s, err.value) from None
+                    result[key] = chain(value, PathNode(path, key))
+                else:
+                    result[key], end = parser(s, end, PathNode(path, key))
+                delimiter = s[end:end + 1]
+                if delimiter in WHITESPACE_CHARS:
+                    end = _skip(s, end)
+                    delimiter = s[end:end + 1]
+                if delimiter == '}':
+                    end += 1
+                    break
+                if delimiter != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", s, end)
+                end = _skip(s, end + 1)
+        for name, chain in required:
+            if result[name] is _MISSING:
+                result[name] = chain(None, PathNode(path, name))
+        return result, end
+
+    return f
+
+
+def _compile_array(schema, options):
+    element = _compile_value(schema['element_type'], schema['filters'], options)
+
+    def f(s, end, path):
+        if s.startswith('null', end):
+            return None, end + 4
+        if s[end:end + 1] != '[':
+            _scan(s, end)
+            raise SchemaTypeError(path, 'not_array')
+        result = []
+        end = _skip(s, end + 1)
+        if s[end:end + 1] == ']':
+            return result, end + 1
+        while True:
+            value, end = element(s, end, PathNode(path, len(result)))
+            result.append(value)
+            delimiter = s[end:end + 1]
+            if delimiter in WHITESPACE_CHARS:
+                end = _skip(s, end)
+                delimiter = s[end:end + 1]
+            if delimiter == ']':
+                return result, end + 1
+            if delimiter != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", s, end)
+            end = _skip(s, end + 1)
+
+    return f
+
+
+PARSER_MAP = {
+    'Object': _compile_object,
+    'Array': _compile_array
+}
+
+
+def compile_parser(schema, fuse_threshold=DEFAULT_FUSE_THRESHOLD):
+    parser = _compile_value(schema, (), {})
+    converter = compile_chain(schema, (), {})
+
+    def loads(data, path=None):
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode(json.detect_encoding(data), 'surrogatepass')
+        if len(data) < fuse_threshold:
+            return converter(json.loads(data), path or [])
+        if data.startswith('\ufeff'):
+            raise json.JSONDecodeError('Unexpected UTF-8 BOM (decode using utf-8-sig)', data, 0)
+        try:
+            value, end = parser(data, _skip(data, 0), path or [])
+        except json.JSONDecodeError:
+            raise
+        except (ValueError, TypeError) as ex:
+            error = ex
+        else:
+            end = _skip(data, end)
+            if end != len(data):
+                raise json.JSONDecodeError('Extra data', data, end)
+            return value
+        converter(json.loads(data), path or [])
+        raise error
+
+    return loads
+
+
+def loads_validated(schema, data, path=None):
+    return compile_cached(schema, _PARSERS, compile_parser)(data, path)
@@ -11,7 +11,9 @@ def JsonField(name, field_type, *filters):
 
 
 def JsonObject(*fields):
-    return {'type': 'Object', 'fields': fields}
+    return {'type': 'Object', 'fields': fields,
+            'field_names': frozenset([x['name'] for x in fields]),
+            'field_map': {x['name']: x for x in fields}}
 
 
 def JsonArray(element_type, *filters):
@@ -19,4 +21,17 @@ def JsonArray(element_type, *filters):
 
 
 def JsonEither(*types):
-    return {'type': 'Either', 'types': types}
\ No newline at end of file
+    return {'type': 'Either', 'types': types}
+
+
+def JsonTaggedUnion(tag_field, branches):
+    return {'type': 'TaggedUnion', 'tag': tag_field, 'branches': branches}
+
+
+def JsonRef(name):
+    return {'type': 'Ref', 'name': name, 'target': None}
+
+
+def bind_ref(ref, target):
+    ref['target'] = target
+    return target
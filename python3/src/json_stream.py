@@ -0,0 +1,158 @@
+import codecs
+import json
+
+from .incoming_compiler import compile_incoming
+from .schema_dsl_common import *
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+WHITESPACE = json.decoder.WHITESPACE
+MAX_TRUNCATED_TOKEN = 6
+
+
+def _iter_lines(binary_file, buffer_size):
+    parts = []
+    while True:
+        chunk = binary_file.read(buffer_size)
+        if not chunk:
+            break
+        start = 0
+        end = chunk.find(b'\n')
+        while end >= 0:
+            parts.append(chunk[start:end])
+            yield b''.join(parts)
+            parts = []
+            start = end + 1
+            end = chunk.find(b'\n', start)
+        if start < len(chunk):
+            parts.append(chunk[start:])
+    if parts:
+        yield b''.join(parts)
+
+
+class NdjsonValidator:
+    def __init__(self, schema, binary_file, buffer_size=DEFAULT_BUFFER_SIZE, skip_invalid=False):
+        self.schema = schema
+        self.binary_file = binary_file
+        self.buffer_size = buffer_size
+        self.skip_invalid = skip_invalid
+        self.skipped = 0
+        self._results = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._results is None:
+            self._results = self._validate()
+        return next(self._results)
+
+    def _validate(self):
+        converter = compile_incoming(self.schema)
+        for line_no, line in enumerate(_iter_lines(self.binary_file, self.buffer_size), 1):
+            if not line.strip():
+                continue
+            try:
+                result = converter(json.loads(line))
+            except (ValueError, TypeError) as ex:
+                if self.skip_invalid:
+                    self.skipped += 1
+                    continue
+                result = ex
+            yield line_no, result
+
+
+def validate_ndjson(schema, binary_file, buffer_size=DEFAULT_BUFFER_SIZE, skip_invalid=False):
+    return NdjsonValidator(schema, binary_file, buffer_size, skip_invalid)
+
+
+class _TextBuffer:
+    def __init__(self, binary_file, buffer_size):
+        self.binary_file = binary_file
+        self.buffer_size = buffer_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        self.offset = 0
+        self.lines = 0
+        self.column = 0
+
+    def fill(self):
+        chunk = self.binary_file.read(max(self.buffer_size, len(self.text) - self.pos))
+        self.eof = not chunk
+        consumed = self.text[:self.pos]
+        last_line = consumed.rfind('\n')
+        self.offset += len(consumed)
+        self.lines += consumed.count('\n')
+        self.column = len(consumed) - last_line - 1 if last_line >= 0 else self.column + len(consumed)
+        self.text = self.text[self.pos:] + self.decoder.decode(chunk, self.eof)
+        self.pos = 0
+
+    def error(self, msg, pos):
+        ex = json.JSONDecodeError(msg, self.text, pos)
+        ex.pos = pos + self.offset
+        ex.colno = ex.colno + self.column if ex.lineno == 1 else ex.colno
+        ex.lineno += self.lines
+        ex.args = '%s: line %d column %d (char %d)' % (msg, ex.lineno, ex.colno, ex.pos),
+        return ex
+
+    def peek(self):
+        while True:
+            self.pos = WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or self.eof:
+                return self.text[self.pos:self.pos + 1]
+            self.fill()
+
+    def _is_truncated(self, ex):
+        return ex.pos + MAX_TRUNCATED_TOKEN >= len(self.text) or ex.msg.startswith('Unterminated string')
+
+    def decode(self, decoder):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as ex:
+                if self.eof or not self._is_truncated(ex):
+                    raise self.error(ex.msg, ex.pos) from None
+            self.fill()
+
+    def expect(self, token, msg):
+        if self.peek() != token:
+            raise self.error(msg, self.pos)
+        self.pos += 1
+
+
+def iter_array(schema, binary_file, path=None, buffer_size=DEFAULT_BUFFER_SIZE):
+    path = path or []
+    element_converter = compile_incoming(schema['element_type'])
+    filters = schema['filters']
+    decoder = json.JSONDecoder()
+    buffer = _TextBuffer(binary_file, buffer_size)
+    first = buffer.peek()
+    if first == 'n':
+        if buffer.decode(decoder) is not None:
+            raise SchemaTypeError(path, 'not_array')
+        return
+    if first != '[':
+        raise SchemaTypeError(path, 'not_array')
+    buffer.pos += 1
+    i = 0
+    if buffer.peek() == ']':
+        buffer.pos += 1
+    else:
+        while True:
+            element_path = PathNode(path, i)
+            result = element_converter(buffer.decode(decoder), element_path)
+            for flt in filters:
+                result = flt(result, element_path)
+            yield result
+            i += 1
+            if buffer.peek() == ']':
+                buffer.pos += 1
+                break
+            buffer.expect(',', "Expecting ',' delimiter")
+    if buffer.peek():
+        raise buffer.error('Extra data', buffer.pos)
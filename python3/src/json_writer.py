@@ -0,0 +1,245 @@
+import json
+
+from . import basic_type
+from .outgoing_compiler import skips_missing
+from .schema_dsl_common import *
+
+DEFAULT_CHUNK_PARTS = 4096
+
+encode_string = json.encoder.encode_basestring_ascii
+_encoder = json.JSONEncoder()
+_WRITERS = {}
+
+
+class _Buffer(list):
+    def __init__(self, write=None, limit=float('inf')):
+        super().__init__()
+        self.write = write
+        self.limit = limit
+
+    def spill(self):
+        self.write(''.join(self))
+        del self[:]
+
+
+def _write_any(value, parts, path):
+    parts.append(_encoder.encode(value))
+
+
+def _write_string(value, parts, path):
+    if value is None:
+        parts.append('null')
+    elif isinstance(value, str):
+        parts.append(encode_string(value))
+    else:
+        raise SchemaTypeError(path, 'not_string')
+
+
+def _write_integer(value, parts, path):
+    if value is None:
+        parts.append('null')
+    elif isinstance(value, bool) or not isinstance(value, int):
+        raise SchemaTypeError(path, 'not_integer')
+    else:
+        parts.append(int.__repr__(value))
+
+
+def _float_string(value):
+    if value != value:
+        return 'NaN'
+    if value == float('inf'):
+        return 'Infinity'
+    if value == float('-inf'):
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+def _write_number(value, parts, path):
+    if value is None:
+        parts.append('null')
+    elif isinstance(value, float):
+        parts.append(_float_string(value))
+    elif isinstance(value, bool) or not isinstance(value, int):
+        raise SchemaTypeError(path, 'not_number')
+    else:
+        parts.append(int.__repr__(value))
+
+
+def _write_boolean(value, parts, path):
+    if value is None:
+        parts.append('null')
+    elif value is True:
+        parts.append('true')
+    elif value is False:
+        parts.append('false')
+    else:
+        raise SchemaTypeError(path, 'not_boolean')
+
+
+def _write_string_map(value, parts, path):
+    parts.append(_encoder.encode(basic_type.string_map(value, path)))
+
+
+def _fuse_filters(filters):
+    actions = tuple([flt.action for flt in filters])
+    if not actions:
+        return None
+    if len(actions) == 1:
+        return actions[0]
+
+    def f(value, path):
+        for action in actions:
+            value = action(value, path)
+        return value
+
+    return f
+
+
+def _compile_field(field, options):
+    name = field['name']
+    key = encode_string(name) + ': '
+    post = _fuse_filters(field['filters'])
+    return name, '{' + key, ', ' + key, post, skips_missing(field['filters']), _compile(field['field_type'], options)
+
+
+def _compile_object(schema, options):
+    fields = tuple([_compile_field(field, options) for field in schema['fields']])
+
+    def f(value, parts, path):
+        if value is None:
+            parts.append('null')
+            return
+        if not isinstance(value, dict):
+            raise SchemaTypeError(path, 'not_object')
+        written = False
+        for name, first_key, key, post, skip, writer in fields:
+            if name in value:
+                field_value = value[name]
+            elif skip:
+                continue
+            else:
+                field_value = None
+            field_path = PathNode(path, name)
+            if post is not None:
+                field_value = post(field_value, field_path)
+                if field_value is None and name not in value:
+                    continue
+            parts.append(key if written else first_key)
+            written = True
+            writer(field_value, parts, field_path)
+        parts.append('}' if written else '{}')
+
+    return f
+
+
+def _compile_array(schema, options):
+    post = _fuse_filters(schema['filters'])
+    writer = _compile(schema['element_type'], options)
+
+    def f(value, parts, path):
+        if value is None:
+            parts.append('null')
+            return
+        if not basic_type.is_array(value):
+            raise SchemaTypeError(path, 'not_array')
+        limit = parts.limit
+        separator = '['
+        for i, element in enumerate(value):
+            parts.append(separator)
+            separator = ', '
+            element_path = PathNode(path, i)
+            if post is not None:
+                element = post(element, element_path)
+            writer(element, parts, element_path)
+            if len(parts) >= limit:
+                parts.spill()
+        parts.append('[]' if separator == '[' else ']')
+
+    return f
+
+
+def _compile_tagged_union(schema, options):
+    tag_name = schema['tag']
+    branches = {tag: _compile(branch, options) for tag, branch in schema['branches'].items()}
+    tag_options = tuple(branches)
+
+    def f(value, parts, path):
+        if value is None:
+            parts.append('null')
+            return
+        if not isinstance(value, dict):
+            raise SchemaTypeError(path, 'not_object')
+        tag = value.get(tag_name)
+        if not isinstance(tag, (str, int, float, bool)) or tag not in branches:
+            raise SchemaValueError(PathNode(path, tag_name), 'invalid_value', tag_options)
+        branches[tag](value, parts, path)
+
+    return f
+
+
+WRITER_MAP = {
+    'Any': lambda schema, options: _write_any,
+    'String': lambda schema, options: _write_string,
+    'Integer': lambda schema, options: _write_integer,
+    'Number': lambda schema, options: _write_number,
+    'Boolean': lambda schema, options: _write_boolean,
+    'StringMap': lambda schema, options: _write_string_map,
+    'Object': _compile_object,
+    'Array': _compile_array,
+    'TaggedUnion': _compile_tagged_union
+}
+
+
+def _compile_schema(schema, options):
+    return WRITER_MAP[schema['type']](schema, options)
+
+
+def _compile(schema, options):
+    return compile_shared(schema, options, _compile_schema)
+
+
+def _compile_root(schema):
+    return _compile(schema, {})
+
+
+def _dumps(writer, value, path):
+    parts = _Buffer()
+    writer(value, parts, path or [])
+    return ''.join(parts)
+
+
+def _dump(writer, value, fp, path, chunk_parts, encoding):
+    if encoding is None:
+        write = fp.write
+    else:
+        def write(chunk):
+            fp.write(chunk.encode(encoding))
+    parts = _Buffer(write, chunk_parts)
+    writer(value, parts, path or [])
+    parts.spill()
+
+
+def compile_writer(schema):
+    writer = _compile_root(schema)
+
+    def dumps(value, path=None):
+        return _dumps(writer, value, path)
+
+    return dumps
+
+
+def compile_stream_writer(schema, chunk_parts=DEFAULT_CHUNK_PARTS, encoding=None):
+    writer = _compile_root(schema)
+
+    def dump(value, fp, path=None):
+        _dump(writer, value, fp, path, chunk_parts, encoding)
+
+    return dump
+
+
+def dumps_outgoing(schema, value, path=None):
+    return _dumps(compile_cached(schema, _WRITERS, _compile_root), value, path)
+
+
+def dump_outgoing(schema, value, fp, path=None, chunk_parts=DEFAULT_CHUNK_PARTS, encoding=None):
+    _dump(compile_cached(schema, _WRITERS, _compile_root), value, fp, path, chunk_parts, encoding)
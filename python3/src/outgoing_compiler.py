@@ -0,0 +1,137 @@
+from . import basic_type
+from . import filters
+from . import validators
+from .schema_dsl_common import *
+
+NONE_SAFE_FACTORIES = frozenset([
+    validators.MaxLength, validators.MinLength, validators.LengthRange, validators.Only, validators.Minimum,
+    validators.ExclusiveMinimum, validators.Maximum, validators.ExclusiveMaximum, validators.Range,
+    validators.Pattern
+])
+
+NONE_SAFE_ACTIONS = frozenset([filters.trim, filters.to_string, filters.to_timestamp])
+
+
+def is_none_safe(flt):
+    return flt.factory in NONE_SAFE_FACTORIES or flt.action in NONE_SAFE_ACTIONS
+
+
+def skips_missing(filters):
+    return all([is_none_safe(flt) for flt in filters])
+
+
+def _compile_chain(schema, filters, options):
+    converter = _compile(schema, options)
+    actions = tuple([flt.action for flt in filters])
+    if not actions:
+        return converter
+    if len(actions) == 1:
+        action = actions[0]
+
+        def f(value, path):
+            return converter(action(value, path), path)
+
+        return f
+
+    def f(value, path):
+        for action in actions:
+            value = action(value, path)
+        return converter(value, path)
+
+    return f
+
+
+def _compile_object(schema, options):
+    fields = tuple([(x['name'], _compile_chain(x['field_type'], x['filters'], options), skips_missing(x['filters']))
+                    for x in schema['fields']])
+    field_index = {name: i for i, (name, converter, skip) in enumerate(fields)}
+    required = tuple([i for i, (name, converter, skip) in enumerate(fields) if not skip])
+
+    def convert_fields(input_object, path, indices):
+        result = {}
+        for i in indices:
+            name, converter, skip = fields[i]
+            if name in input_object:
+                result[name] = converter(input_object[name], PathNode(path, name))
+            elif not skip:
+                value = converter(None, PathNode(path, name))
+                if value is not None:
+                    result[name] = value
+        return result
+
+    all_indices = range(len(fields))
+
+    def f(input_object, path):
+        if input_object is None:
+            return None
+        if not isinstance(input_object, dict):
+            raise SchemaTypeError(path, 'not_object')
+        if len(input_object) >= len(fields):
+            return convert_fields(input_object, path, all_indices)
+        indices = [field_index[name] for name in input_object if name in field_index]
+        indices += [i for i in required if fields[i][0] not in input_object]
+        indices.sort()
+        return convert_fields(input_object, path, indices)
+
+    return f
+
+
+def _compile_array(schema, options):
+    element = _compile_chain(schema['element_type'], schema['filters'], options)
+
+    def f(input_object, path):
+        if input_object is None:
+            return None
+        if not basic_type.is_array(input_object):
+            raise SchemaTypeError(path, 'not_array')
+        return [element(x, PathNode(path, i)) for i, x in enumerate(input_object)]
+
+    return f
+
+
+def _compile_tagged_union(schema, options):
+    tag_name = schema['tag']
+    branches = {tag: _compile(branch, options) for tag, branch in schema['branches'].items()}
+    tag_options = tuple(branches)
+
+    def f(input_object, path):
+        if input_object is None:
+            return None
+        if not isinstance(input_object, dict):
+            raise SchemaTypeError(path, 'not_object')
+        tag = input_object.get(tag_name)
+        if isinstance(tag, (str, int, float, bool)) and tag in branches:
+            return branches[tag](input_object, path)
+        raise SchemaValueError(PathNode(path, tag_name), 'invalid_value', tag_options)
+
+    return f
+
+
+COMPILER_MAP = {
+    'Any': lambda schema, options: basic_type.any_type,
+    'String': lambda schema, options: basic_type.string_type,
+    'Integer': lambda schema, options: basic_type.integer_type,
+    'Number': lambda schema, options: basic_type.number_type,
+    'Boolean': lambda schema, options: basic_type.boolean_type,
+    'StringMap': lambda schema, options: basic_type.string_map,
+    'Object': _compile_object,
+    'Array': _compile_array,
+    'TaggedUnion': _compile_tagged_union
+}
+
+
+def _compile_schema(schema, options):
+    return COMPILER_MAP[schema['type']](schema, options)
+
+
+def _compile(schema, options):
+    return compile_shared(schema, options, _compile_schema)
+
+
+def compile_outgoing(schema):
+    converter = _compile(schema, {})
+
+    def convert(input_object, path=None):
+        return converter(input_object, path or [])
+
+    return convert
@@ -1,3 +1,85 @@
+import collections
+
+COMPILED_CACHE_SIZE = 256
+
+FieldError = collections.namedtuple('FieldError', ['path', 'code', 'message'])
+
+ERROR_MESSAGES = {
+    'not_null': 'Cannot be null',
+    'empty': 'Cannot be empty',
+    'too_long': 'String is too long',
+    'too_short': 'String is too short',
+    'too_small': 'Value is too small',
+    'too_large': 'Value is too large',
+    'pattern_mismatch': 'Pattern not match',
+    'invalid_value': 'Invalid value',
+    'not_in_options': 'Invalid value',
+    'not_string': 'Should be a string',
+    'not_integer': 'Should be an integer',
+    'not_number': 'Should be a number',
+    'not_boolean': 'Should be a boolean',
+    'not_object': 'Should be an object',
+    'not_array': 'Should be an array',
+    'too_deep': 'Nesting is too deep',
+}
+
+
+class PathNode:
+    __slots__ = ('parent', 'name')
+
+    def __init__(self, parent, name):
+        self.parent = parent
+        self.name = name
+
+    def to_list(self):
+        names = []
+        node = self
+        while isinstance(node, PathNode):
+            names.append(str(node.name))
+            node = node.parent
+        names.reverse()
+        return list(node or []) + names
+
+    def to_tuple(self):
+        names = []
+        node = self
+        while isinstance(node, PathNode):
+            names.append(node.name)
+            node = node.parent
+        names.reverse()
+        return tuple(node or ()) + tuple(names)
+
+    def __add__(self, other):
+        node = self
+        for name in other:
+            node = PathNode(node, name)
+        return node
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __len__(self):
+        return len(self.to_list())
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, index):
+        return self.to_list()[index]
+
+    def __eq__(self, other):
+        return self.to_list() == list(other)
+
+    def __repr__(self):
+        return repr(self.to_list())
+
+
+def get_path_tuple(path):
+    if isinstance(path, PathNode):
+        return path.to_tuple()
+    return tuple(path)
+
+
 def get_path_string(path):
     if not path:
         return ''
@@ -10,20 +92,113 @@ def get_message(path, msg):
     return get_path_string(path) + ': ' + msg
 
 
+def get_unrecognized_message(diff_set):
+    diff = list(diff_set)
+    if len(diff) == 1:
+        return 'Unrecognized field: ' + diff[0]
+    return 'Unrecognized fields: ' + ', '.join([x for x in diff])
+
+
+class SchemaValidationError(Exception):
+    def __init__(self, path, code, constraint=None):
+        super().__init__()
+        self._path = tuple(path) if isinstance(path, list) else path
+        self._path_tuple = None
+        self.code = code
+        self.constraint = constraint
+
+    @property
+    def path(self):
+        if self._path_tuple is None:
+            self._path_tuple = get_path_tuple(self._path)
+        return self._path_tuple
+
+    @property
+    def message(self):
+        if self.code == 'unrecognized_field':
+            return get_message(self._path, get_unrecognized_message(self.constraint))
+        return get_message(self._path, ERROR_MESSAGES[self.code])
+
+    @property
+    def args(self):
+        return self.message,
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return '%s(%r, %r, %r)' % (type(self).__name__, self.path, self.code, self.constraint)
+
+    def __reduce__(self):
+        return type(self), (self._path, self.code, self.constraint)
+
+
+class SchemaValueError(SchemaValidationError, ValueError):
+    pass
+
+
+class SchemaTypeError(SchemaValidationError, TypeError):
+    pass
+
+
 class SchemaFilter:
-    def __init__(self, filter_type, name, action):
+    def __init__(self, filter_type, name, action, factory=None, params=()):
         self.filter_type = filter_type
         self.name = name
         self.action = action
+        self.factory = factory
+        self.params = params
 
     def __call__(self, *args):
         return self.action(*args)
 
+    def __reduce__(self):
+        if self.factory is None:
+            return SchemaFilter, (self.filter_type, self.name, self.action)
+        return self.factory, self.params
+
+
+def get_tagged_branch(schema, input_object, path):
+    tag = input_object.get(schema['tag'])
+    if isinstance(tag, (str, int, float, bool)) and tag in schema['branches']:
+        return resolve_ref(schema['branches'][tag])
+    raise SchemaValueError(PathNode(path, schema['tag']), 'invalid_value', tuple(schema['branches']))
+
+
+def resolve_ref(schema):
+    while schema['type'] == 'Ref':
+        if schema['target'] is None:
+            raise ValueError('Unbound reference: ' + schema['name'])
+        schema = schema['target']
+    return schema
+
+
+def compile_shared(schema, options, compile_schema):
+    target = resolve_ref(schema)
+    compiled = options.setdefault(compile_schema, {})
+    if id(target) not in compiled:
+        cell = compiled[id(target)] = []
+        cell.append(compile_schema(target, options))
+    cell = compiled[id(target)]
+    if cell:
+        return cell[0]
+
+    def f(*args):
+        return cell[0](*args)
+
+    return f
+
+
+def compile_cached(schema, cache, compile_schema):
+    entry = cache.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        if len(cache) >= COMPILED_CACHE_SIZE:
+            cache.clear()
+        entry = cache[id(schema)] = schema, compile_schema(schema)
+    return entry[1]
+
 
 def find_field(schema_object, field_name):
-    for field in schema_object['fields']:
-        if field['name'] == field_name:
-            return field
-    return None
+    return schema_object['field_map'].get(field_name)
 
 
@@ -14,6 +14,13 @@ def _get_object_field(schema_object, obj, name):
     return field['field_type'], obj[name]
 
 
+def _get_tagged_union_field(schema_object, obj, name):
+    branch = schema_object['branches'].get(obj.get(schema_object['tag']))
+    if branch is None:
+        raise ValueError('Unrecognized field: ' + name)
+    return _get_object_field(schema_dsl_common.resolve_ref(branch), obj, name)
+
+
 def _get_array_field(schema_object, obj, index):
     if isinstance(index, bool) or not isinstance(index, int):
         raise TypeError('Index should be integer')
@@ -28,6 +35,10 @@ def _get_basic_field(schema_object, obj, name):
     raise ValueError('Path is too long')
 
 
+def _get_ref_field(schema_object, obj, name):
+    return _get_field(schema_dsl_common.resolve_ref(schema_object), obj, name)
+
+
 FIELD_TYPE_GETTER_MAP = {
     'String': _get_basic_field,
     'Integer': _get_basic_field,
@@ -35,7 +46,9 @@ FIELD_TYPE_GETTER_MAP = {
     'Boolean': _get_basic_field,
     'StringMap': _get_string_map_field,
     'Object': _get_object_field,
-    'Array': _get_array_field
+    'Array': _get_array_field,
+    'TaggedUnion': _get_tagged_union_field,
+    'Ref': _get_ref_field
 }
 
 
@@ -1,12 +1,23 @@
 from . import schema_dsl_common
 
 
+CONTAINER_TYPES = ('Object', 'TaggedUnion', 'StringMap')
+
+
+def _get_branch(schema_obj, obj, name):
+    branch = schema_obj['branches'].get(obj.get(schema_obj['tag']))
+    if branch is None:
+        raise ValueError('Unrecognized field: ' + name)
+    return schema_dsl_common.resolve_ref(branch)
+
+
 def _walk_field_common(obj, name, field_type):
+    field_type = schema_dsl_common.resolve_ref(field_type)
     field_type_type = field_type['type']
-    if field_type_type != 'Object' and field_type_type != 'Array' and field_type_type != 'StringMap':
+    if field_type_type not in CONTAINER_TYPES and field_type_type != 'Array':
         raise ValueError('Path is too long')
     if name not in obj or obj[name] is None:
-        if field_type_type == 'Object' or field_type_type == 'StringMap':
+        if field_type_type in CONTAINER_TYPES:
             obj[name] = {}
         else:
             obj[name] = []
@@ -31,7 +42,10 @@ def _walk_array_field(schema_obj, obj, index):
 
 
 def _walk_fields(schema_obj, obj, path):
+    schema_obj = schema_dsl_common.resolve_ref(schema_obj)
     for name in path:
+        if schema_obj['type'] == 'TaggedUnion':
+            schema_obj = _get_branch(schema_obj, obj, name)
         if schema_obj['type'] == 'Object':
             schema_obj, obj = _walk_object_field(schema_obj, obj, name)
         elif schema_obj['type'] == 'Array':
@@ -42,6 +56,9 @@ def _walk_fields(schema_obj, obj, path):
 
 
 def _set_field(schema_obj, obj, name, value):
+    schema_obj = schema_dsl_common.resolve_ref(schema_obj)
+    if schema_obj['type'] == 'TaggedUnion':
+        schema_obj = _get_branch(schema_obj, obj, name)
     if schema_obj['type'] == 'Object':
         field = schema_dsl_common.find_field(schema_obj, name)
         if field is None:
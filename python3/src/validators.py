@@ -4,15 +4,15 @@ from .schema_dsl_common import *
 
 def _not_null(value, path):
     if value is None:
-        raise ValueError(get_message(path, 'Cannot be null'))
+        raise SchemaValueError(path, 'not_null')
     return value
 
 
 def _not_empty(value, path):
     if value is None:
-        raise ValueError(get_message(path, 'Cannot be null'))
+        raise SchemaValueError(path, 'not_null')
     if value == '':
-        raise ValueError(get_message(path, 'Cannot be empty'))
+        raise SchemaValueError(path, 'empty')
     return value
 
 
@@ -21,7 +21,7 @@ def _max_length(length):
         if value is None:
             return None
         if len(value) > length:
-            raise ValueError(get_message(path, 'String is too long'))
+            raise SchemaValueError(path, 'too_long', length)
         return value
 
     return f
@@ -32,7 +32,7 @@ def _min_length(length):
         if value is None:
             return None
         if len(value) < length:
-            raise ValueError(get_message(path, 'String is too short'))
+            raise SchemaValueError(path, 'too_short', length)
         return value
 
     return f
@@ -43,9 +43,9 @@ def _length_range(low, high):
         if value is None:
             return None
         if len(value) < low:
-            raise ValueError(get_message(path, 'String is too short'))
+            raise SchemaValueError(path, 'too_short', low)
         if len(value) > high:
-            raise ValueError(get_message(path, 'String is too long'))
+            raise SchemaValueError(path, 'too_long', high)
         return value
 
     return f
@@ -58,7 +58,7 @@ def _only(*options):
         if value is None:
             return None
         if value not in option_set:
-            raise ValueError(get_message(path, 'Invalid value'))
+            raise SchemaValueError(path, 'not_in_options', options)
         return value
 
     return f
@@ -69,7 +69,7 @@ def _minimum(low):
         if value is None:
             return None
         if value < low:
-            raise ValueError(get_message(path, 'Value is too small'))
+            raise SchemaValueError(path, 'too_small', low)
         return value
 
     return f
@@ -80,7 +80,7 @@ def _exclusive_minimum(low):
         if value is None:
             return None
         if value <= low:
-            raise ValueError(get_message(path, 'Value is too small'))
+            raise SchemaValueError(path, 'too_small', low)
         return value
 
     return f
@@ -91,7 +91,7 @@ def _maximum(high):
         if value is None:
             return None
         if value > high:
-            raise ValueError(get_message(path, 'Value is too large'))
+            raise SchemaValueError(path, 'too_large', high)
         return value
 
     return f
@@ -102,7 +102,7 @@ def _exclusive_maximum(high):
         if value is None:
             return None
         if value >= high:
-            raise ValueError(get_message(path, 'Value is too large'))
+            raise SchemaValueError(path, 'too_large', high)
         return value
 
     return f
@@ -113,9 +113,9 @@ def _range(low, high):
         if value is None:
             return None
         if value < low:
-            raise ValueError(get_message(path, 'Value is too small'))
+            raise SchemaValueError(path, 'too_small', low)
         if value > high:
-            raise ValueError(get_message(path, 'Value is too large'))
+            raise SchemaValueError(path, 'too_large', high)
         return value
 
     return f
@@ -128,7 +128,7 @@ def _pattern(_pattern):
         if value is None:
             return None
         if re_obj.match(value) is None:
-            raise ValueError(get_message(path, 'Pattern not match'))
+            raise SchemaValueError(path, 'pattern_mismatch', _pattern)
         return value
 
     return f
@@ -139,42 +139,42 @@ NotEmpty = SchemaFilter('validator', 'NotEmpty', _not_empty)
 
 
 def MaxLength(length):
-    return SchemaFilter('validator', 'MaxLength', _max_length(length))
+    return SchemaFilter('validator', 'MaxLength', _max_length(length), MaxLength, (length,))
 
 
 def MinLength(length):
-    return SchemaFilter('validator', 'MinLength', _min_length(length))
+    return SchemaFilter('validator', 'MinLength', _min_length(length), MinLength, (length,))
 
 
 def LengthRange(low, high):
-    return SchemaFilter('validator', 'LengthRange', _length_range(low, high))
+    return SchemaFilter('validator', 'LengthRange', _length_range(low, high), LengthRange, (low, high))
 
 
 def Only(*options):
-    return SchemaFilter('validator', 'Only', _only(*options))
+    return SchemaFilter('validator', 'Only', _only(*options), Only, options)
 
 
 def Minimum(low):
-    return SchemaFilter('validator', 'Minimum', _minimum(low))
+    return SchemaFilter('validator', 'Minimum', _minimum(low), Minimum, (low,))
 
 
 def ExclusiveMinimum(low):
-    return SchemaFilter('validator', 'ExclusiveMinimum', _exclusive_minimum(low))
+    return SchemaFilter('validator', 'ExclusiveMinimum', _exclusive_minimum(low), ExclusiveMinimum, (low,))
 
 
 def Maximum(high):
-    return SchemaFilter('validator', 'Maximum', _maximum(high))
+    return SchemaFilter('validator', 'Maximum', _maximum(high), Maximum, (high,))
 
 
 def ExclusiveMaximum(high):
-    return SchemaFilter('validator', 'ExclusiveMaximum', _exclusive_maximum(high))
+    return SchemaFilter('validator', 'ExclusiveMaximum', _exclusive_maximum(high), ExclusiveMaximum, (high,))
 
 
 def Range(low, high):
-    return SchemaFilter('validator', 'Range', _range(low, high))
+    return SchemaFilter('validator', 'Range', _range(low, high), Range, (low, high))
 
 
 def Pattern(re):
-    return SchemaFilter('validator', 'Pattern', _pattern(re))
+    return SchemaFilter('validator', 'Pattern', _pattern(re), Pattern, (re,))
 
 
@@ -0,0 +1,115 @@
+import unittest
+import unittest.mock
+from src.json_schema_dsl import *
+from src.validators import *
+from src.filters import *
+from src import array_fastpath
+from src import json_incoming
+from src.incoming_compiler import compile_incoming
+
+ROOT = ['root']
+
+
+def _run(converter, *args):
+    try:
+        return 'result', converter(*args)
+    except (ValueError, TypeError) as ex:
+        return type(ex), ex.args[0]
+
+
+number_schema = JsonObject(
+    JsonField('samples', JsonArray(JsonNumber, Range(-10, 10), ExclusiveMaximum(9.5))),
+    JsonField('counts', JsonArray(JsonInteger, Minimum(0), Maximum(100), ExclusiveMinimum(-1))),
+    JsonField('large_counts', JsonArray(JsonInteger, Maximum(9007199254740992.0))),
+    JsonField('large_samples', JsonArray(JsonNumber, ExclusiveMaximum(2 ** 53 + 1))),
+    JsonField('huge_counts', JsonArray(JsonInteger, Minimum(-2 ** 70))),
+)
+
+
+@unittest.skipIf(array_fastpath.numpy is None, 'numpy is not installed')
+class TestNumericArray(unittest.TestCase):
+    def assert_same(self, data):
+        expected = _run(json_incoming.convert, number_schema, data, ROOT)
+        actual = _run(compile_incoming(number_schema, numpy_arrays=True), data, ROOT)
+        self.assertEqual(expected, actual)
+
+    def test_same_as_convert(self):
+        for data in [{'samples': [1, 2.5, -10, 9]}, {'samples': []}, {'samples': [1, 11, -11]},
+                     {'samples': [1, 9.5]}, {'samples': [1, None, 20]}, {'samples': [1, True]},
+                     {'samples': [1, 'a', 20]}, {'samples': 'a'}, {'samples': None},
+                     {'counts': [0, 100, 5]}, {'counts': [0, 101, -1]}, {'counts': [1, 2.0]},
+                     {'counts': [2 ** 70]}, {'samples': [2 ** 60, 0.5]},
+                     {'large_counts': [9007199254740993]}, {'large_counts': [9007199254740992, 1]},
+                     {'large_samples': [9007199254740992.0]}, {'large_samples': [1.5]},
+                     {'huge_counts': [1, -5]}]:
+            self.assert_same(data)
+
+    def test_first_failing_index(self):
+        data = {'samples': [0.0] * 1000 + [10.5] + [-20.0] * 10}
+        try:
+            compile_incoming(number_schema, numpy_arrays=True)(data)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('samples.1000: Value is too large', ex.args[0])
+
+    def test_result_is_a_copy(self):
+        samples = [1, 2, 3]
+        result = compile_incoming(number_schema, numpy_arrays=True)({'samples': samples})
+        self.assertEqual(samples, result['samples'])
+        self.assertIsNot(samples, result['samples'])
+        self.assertIsInstance(result['samples'][0], int)
+
+    def test_as_ndarray(self):
+        converter = compile_incoming(number_schema, numpy_arrays=True, as_ndarray=True)
+        result = converter({'samples': [1, 2.5], 'counts': [3, 4]})
+        self.assertIsInstance(result['samples'], array_fastpath.numpy.ndarray)
+        self.assertEqual([1.0, 2.5], result['samples'].tolist())
+        self.assertEqual([3, 4], result['counts'].tolist())
+
+    def test_not_applicable(self):
+        schema = JsonArray(JsonNumber, NotNull)
+        self.assertEqual([1, 2], compile_incoming(schema, numpy_arrays=True, as_ndarray=True)([1, 2]))
+
+
+string_schema = JsonObject(
+    JsonField('tags', JsonArray(JsonString, NotEmpty, MinLength(1), MaxLength(4), Pattern('^[a-z]'))),
+    JsonField('kinds', JsonArray(JsonString, Only('a', 'b', 'c'))),
+    JsonField('spec', JsonStringMap),
+    JsonField('trimmed', JsonArray(JsonString, Trim, MaxLength(2))),
+)
+
+
+class TestStringArray(unittest.TestCase):
+    def test_same_as_convert(self):
+        for data in [{'tags': ['ab', 'c', 'defg']}, {'tags': []}, {'tags': ['ab', 'abcde', '']},
+                     {'tags': ['ab', '', 'abcde']}, {'tags': ['ab', 'A']}, {'tags': ['ab', None]},
+                     {'tags': ['ab', 5]}, {'tags': 'ab'}, {'kinds': ['a', 'c', 'a']}, {'kinds': ['a', 'd', 'e']},
+                     {'spec': {'a': 'b', 'c': 'd'}}, {'spec': {'a': 'b', 'c': 1}}, {'spec': []},
+                     {'trimmed': [' ab ']}, {'trimmed': [' abc ']}]:
+            expected = _run(json_incoming.convert, string_schema, data, ROOT)
+            self.assertEqual(expected, _run(compile_incoming(string_schema), data, ROOT))
+            self.assertEqual(expected, _run(compile_incoming(string_schema, numpy_arrays=True), data, ROOT))
+
+    def test_with_numpy_arrays(self):
+        with unittest.mock.patch.object(array_fastpath, 'string_array', wraps=array_fastpath.string_array) as check:
+            compile_incoming(JsonArray(JsonString, MaxLength(3)), numpy_arrays=True)
+            self.assertTrue(check.call_count > 0)
+
+    def test_first_offending_index(self):
+        data = {'kinds': ['a'] * 500 + ['x', 'y']}
+        try:
+            compile_incoming(string_schema)(data)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('kinds.500: Invalid value', ex.args[0])
+
+    def test_string_subclass(self):
+        class Tag(str):
+            pass
+
+        data = {'tags': [Tag('ab')], 'spec': {'a': Tag('b')}}
+        self.assertEqual(json_incoming.convert(string_schema, data), compile_incoming(string_schema)(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import os
+import tempfile
+import unittest
+from src.json_schema_dsl import *
+from src.validators import *
+from src.filters import *
+from src import json_incoming
+from src.incoming_codegen import *
+import test_incoming_object
+
+ROOT = ['root']
+
+schema1 = JsonObject(
+    JsonField('node', JsonString, NotNull, MaxLength(6)),
+    JsonField('user', JsonArray(JsonString, MaxLength(6))),
+    JsonField('tag', JsonObject(JsonField('name', JsonString, MaxLength(4)),
+                                JsonField('level', JsonInteger, Range(0, 3)),
+                                )),
+    JsonField('event', JsonArray(JsonObject(JsonField('name', JsonString, MaxLength(3)),
+                                            JsonField('alarm', JsonBoolean)
+                                            ))),
+    JsonField('spec', JsonStringMap),
+    JsonField('amount', JsonEither(JsonString, JsonNumber), ToString),
+    JsonField('credential', JsonEither(JsonObject(
+        JsonField('userId', JsonInteger),
+        JsonField('password', JsonString, MinLength(4))
+    ), JsonString, JsonObject(
+        JsonField('email', JsonString),
+        JsonField('passphrase', JsonString, MinLength(5))
+    )))
+)
+
+
+def _run(converter, *args):
+    try:
+        return 'result', converter(*args)
+    except (ValueError, TypeError) as ex:
+        return type(ex), ex.args[0]
+
+
+class CodegenBackend:
+    def convert(self, schema, data, path=None):
+        return compile_incoming_source(schema)(data, path)
+
+
+class TestCodegenSchema1(CodegenBackend, test_incoming_object.TestSchema1):
+    pass
+
+
+class TestCodegenSchema2(CodegenBackend, test_incoming_object.TestSchema2):
+    pass
+
+
+class TestCodegenSchema3(CodegenBackend, test_incoming_object.TestSchema3):
+    pass
+
+
+class TestCodegenSchema4(CodegenBackend, test_incoming_object.TestSchema4):
+    pass
+
+
+class TestCodegenSchema5(CodegenBackend, test_incoming_object.TestSchema5):
+    pass
+
+
+class TestCodegenSchema6(CodegenBackend, test_incoming_object.TestSchema6):
+    pass
+
+
+class TestCodegenSchema7(CodegenBackend, test_incoming_object.TestSchema7):
+    pass
+
+
+class TestCodegenSchema8(CodegenBackend, test_incoming_object.TestSchema8):
+    pass
+
+
+class TestCodegenSchema9(CodegenBackend, test_incoming_object.TestSchema9):
+    pass
+
+
+class TestCodegenSchema10(CodegenBackend, test_incoming_object.TestSchema10):
+    pass
+
+
+class TestGeneratedModule(unittest.TestCase):
+    def test_source_inlines_field_names(self):
+        source = generate_incoming_source(schema1)
+        self.assertIn("value.get('node')", source)
+        self.assertIn('def convert(value, path=None):', source)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'schema1.py')
+            save_incoming_module(schema1, filename)
+            converter = load_incoming_module(schema1, filename)
+        data = {'node': 'abc', 'amount': 1.5}
+        self.assertEqual(json_incoming.convert(schema1, data), converter(data))
+        try:
+            converter({'node': 'abcdefg'}, ROOT)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('root.node: String is too long', ex.args[0])
+
+    def test_load_mismatched_schema(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'schema1.py')
+            save_incoming_module(schema1, filename)
+            try:
+                load_incoming_module(JsonObject(JsonField('node', JsonString)), filename)
+                self.assertTrue(False)
+            except ValueError as ex:
+                self.assertEqual('Generated module does not match the schema: ' + filename, ex.args[0])
+
+schema_nested = JsonTaggedUnion('kind', {
+    'a': JsonObject(JsonField('kind', JsonString),
+                    JsonField('child', JsonTaggedUnion('kind', {
+                        'x': JsonObject(JsonField('kind', JsonString), JsonField('v', JsonInteger, NotNull)),
+                        'y': JsonObject(JsonField('kind', JsonString)),
+                    }))),
+    'b': JsonObject(JsonField('kind', JsonString), JsonField('w', JsonString)),
+})
+
+
+class TestNestedTaggedUnion(unittest.TestCase):
+    def test_same_as_convert(self):
+        converter = compile_incoming_source(schema_nested)
+        for data in [{'kind': 'a', 'child': {'kind': 'x', 'v': 1}}, {'kind': 'a', 'child': {'kind': 'y'}},
+                     {'kind': 'a', 'child': {'kind': 'x'}}, {'kind': 'a', 'child': {'kind': 'a'}},
+                     {'kind': 'b', 'w': 'c'}, {'kind': 'x', 'v': 1}, {'kind': 'a'}]:
+            expected = _run(json_incoming.convert, schema_nested, data, ROOT)
+            self.assertEqual(expected, _run(converter, data, ROOT))
+
+
+schema4 = JsonObject(
+    JsonField('code', JsonString, NotNull, MinLength(1), MaxLength(3), Pattern('^x'), Only('x', 'xy', 'xyz')),
+    JsonField('name', JsonString, NotEmpty, Pattern('^[a-z]*$')),
+    JsonField('level', JsonInteger, ExclusiveMinimum(0), ExclusiveMaximum(5)),
+    JsonField('ratio', JsonNumber, Range(0, 1.5), Maximum(float('inf'))),
+    JsonField('flag', JsonBoolean, NotNull),
+    JsonField('trimmed', JsonString, Trim, MaxLength(2)),
+)
+
+
+class TestInlinePipeline(unittest.TestCase):
+    def test_same_as_convert(self):
+        valid = {'code': 'xy', 'name': 'abc', 'level': 1, 'ratio': 0.5, 'flag': False, 'trimmed': ' ab '}
+        for change in [{}, {'code': None}, {'code': ''}, {'code': 'xyzw'}, {'code': 'ab'}, {'code': 'xx'},
+                       {'code': 5}, {'name': None}, {'name': ''}, {'name': 'A'}, {'level': 0}, {'level': 5},
+                       {'level': 1.0}, {'level': True}, {'ratio': -1}, {'ratio': 1.6}, {'ratio': 'a'},
+                       {'flag': None}, {'flag': 0}, {'trimmed': ' abc '}, {'trimmed': 1}]:
+            data = dict(valid)
+            data.update(change)
+            expected = _run(json_incoming.convert, schema4, data, ROOT)
+            actual = _run(compile_incoming_source(schema4), data, ROOT)
+            self.assertEqual(expected, actual)
+
+
+comment_ref = JsonRef('Comment')
+schema_comment = bind_ref(comment_ref, JsonObject(
+    JsonField('text', JsonString, Trim, MaxLength(3)),
+    JsonField('replies', JsonArray(comment_ref), NotNull),
+))
+
+
+class TestRef(unittest.TestCase):
+    def test_same_as_convert(self):
+        converter = compile_incoming_source(schema_comment)
+        for data in [{'text': ' a ', 'replies': [{'text': 'b ', 'replies': []}]},
+                     {'text': 'a', 'replies': [{'text': 'b', 'replies': [{'text': 'abcd', 'replies': []}]}]},
+                     {'text': 'a', 'replies': [{'text': 'b'}]}]:
+            expected = _run(json_incoming.convert, schema_comment, data, ROOT)
+            self.assertEqual(expected, _run(converter, data, ROOT))
+
+    def test_single_function_per_target(self):
+        source = generate_incoming_source(schema_comment)
+        self.assertEqual(2, source.count('\ndef convert_'))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'comment.py')
+            save_incoming_module(schema_comment, filename)
+            converter = load_incoming_module(schema_comment, filename)
+        data = {'text': ' a ', 'replies': [{'text': ' bc ', 'replies': []}]}
+        self.assertEqual({'text': 'a', 'replies': [{'text': 'bc', 'replies': []}]}, converter(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,282 @@
+import unittest
+from src.json_schema_dsl import *
+from src.validators import *
+from src.schema_dsl_common import SchemaFilter
+from src.filters import *
+from src import json_incoming
+from src.incoming_compiler import compile_incoming, merge_filters
+
+ROOT = ['root']
+
+schema1 = JsonObject(
+    JsonField('node', JsonString, NotNull, MaxLength(6)),
+    JsonField('user', JsonArray(JsonString, MaxLength(6))),
+    JsonField('tag', JsonObject(JsonField('name', JsonString, MaxLength(4)),
+                                JsonField('level', JsonInteger, Range(0, 3)),
+                                )),
+    JsonField('event', JsonArray(JsonObject(JsonField('name', JsonString, MaxLength(3)),
+                                            JsonField('alarm', JsonBoolean)
+                                            ))),
+    JsonField('spec', JsonStringMap),
+    JsonField('amount', JsonEither(JsonString, JsonNumber), ToString),
+    JsonField('credential', JsonEither(JsonObject(
+        JsonField('userId', JsonInteger),
+        JsonField('password', JsonString, MinLength(4))
+    ), JsonString, JsonObject(
+        JsonField('email', JsonString),
+        JsonField('passphrase', JsonString, MinLength(5))
+    )))
+)
+
+
+def _run(converter, *args):
+    try:
+        return 'result', converter(*args)
+    except (ValueError, TypeError) as ex:
+        return type(ex), ex.args[0]
+
+
+class TestCompileIncoming(unittest.TestCase):
+    def assert_same(self, schema, data, path=None):
+        expected = _run(json_incoming.convert, schema, data, path)
+        actual = _run(compile_incoming(schema), data, path)
+        self.assertEqual(expected, actual)
+
+    def test_valid_object(self):
+        data = {'node': 'abc', 'user': ['abc', None], 'tag': {'name': 'ab', 'level': 2},
+                'event': [{'name': 'abc'}, {'alarm': False}], 'spec': {'a': 'b'}, 'amount': 1.5,
+                'credential': {'email': 'x', 'passphrase': 'abcdef'}}
+        self.assert_same(schema1, data)
+        self.assert_same(schema1, data, ROOT)
+
+    def test_type_errors(self):
+        self.assert_same(schema1, {'node': 5})
+        self.assert_same(schema1, {'node': 'a', 'user': {'abc': 1}})
+        self.assert_same(schema1, {'node': 'a', 'user': ['abc', 5]}, ROOT)
+        self.assert_same(schema1, {'node': 'a', 'tag': 'abc'})
+        self.assert_same(schema1, {'node': 'a', 'spec': {'def': 1}})
+        self.assert_same(schema1, 'abc', ROOT)
+
+    def test_value_errors(self):
+        self.assert_same(schema1, {'node': None})
+        self.assert_same(schema1, {'node': 'abcdefg'})
+        self.assert_same(schema1, {'node': 'a', 'tag': {'level': 4}}, ROOT)
+        self.assert_same(schema1, {'node': 'a', 'event': [{'name': 'abc'}, {'name': 'abcd'}]})
+
+    def test_redundant_field(self):
+        self.assert_same(schema1, {'node': 'abcd', 'xxx': 6}, ROOT)
+        self.assert_same(schema1, {'node': 'a', 'tag': {'xxx': 6}})
+
+    def test_either(self):
+        self.assert_same(schema1, {'node': 'a', 'amount': '1.11'})
+        self.assert_same(schema1, {'node': 'a', 'amount': True}, ROOT)
+        self.assert_same(schema1, {'node': 'a', 'credential': 'xyz'})
+        self.assert_same(schema1, {'node': 'a', 'credential': {'userId': 5, 'password': 'abc'}})
+        self.assert_same(schema1, {'node': 'a', 'credential': 3.5})
+
+    def test_none(self):
+        self.assert_same(schema1, None)
+        self.assert_same(JsonArray(JsonInteger), None)
+
+    def test_top_level_array(self):
+        schema = JsonArray(JsonObject(JsonField('name', JsonString, NotNull, MaxLength(4))))
+        self.assert_same(schema, [{'name': 'def'}, {'name': 'abce'}])
+        self.assert_same(schema, [{'name': 'def'}, {'name': 'abcde'}])
+        self.assert_same(schema, [{'name': 'def'}, {}], ROOT)
+
+
+event_calls = []
+
+
+def _count_event(value, path):
+    event_calls.append(value)
+    return value
+
+
+schema2 = JsonEither(
+    JsonObject(JsonField('x', JsonInteger, SchemaFilter('validator', 'Count', _count_event)),
+               JsonField('kind', JsonString, Only('click'))),
+    JsonObject(JsonField('kind', JsonString, NotNull, Only('scroll', 'zoom')),
+               JsonField('delta', JsonNumber)),
+    JsonArray(JsonInteger),
+    JsonString
+)
+
+
+class TestCompileEither(unittest.TestCase):
+    def assert_same(self, schema, data, path=None):
+        expected = _run(json_incoming.convert, schema, data, path)
+        actual = _run(compile_incoming(schema), data, path)
+        self.assertEqual(expected, actual)
+
+    def test_same_as_convert(self):
+        for data in [None, 'abc', 5, 1.5, True, [1, 2], [1, 'a'], {'kind': 'click', 'x': 1},
+                     {'kind': 'zoom', 'delta': 0.5}, {'kind': 'pan'}, {'kind': ['click']}, {'x': 1},
+                     {'delta': 1}, {'kind': 'zoom', 'x': 1}]:
+            self.assert_same(schema2, data, ROOT)
+
+    def test_tag_skips_branch(self):
+        del event_calls[:]
+        converter = compile_incoming(schema2)
+        try:
+            converter({'kind': 'zoom', 'x': 1})
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('Invalid value', ex.args[0])
+        self.assertEqual([], event_calls)
+        self.assertEqual({'x': 3, 'kind': 'click'}, converter({'kind': 'click', 'x': 3}))
+        self.assertEqual([3], event_calls)
+
+    def test_type_without_branch(self):
+        try:
+            compile_incoming(schema2)(False, ROOT)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('root: Invalid value', ex.args[0])
+
+
+schema3 = JsonArray(JsonTaggedUnion('kind', {
+    'click': JsonObject(JsonField('kind', JsonString), JsonField('x', JsonInteger, NotNull)),
+    'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonNumber, Range(-10, 10))),
+    1: JsonObject(JsonField('kind', JsonInteger)),
+}))
+
+
+class TestCompileTaggedUnion(unittest.TestCase):
+    def test_same_as_convert(self):
+        for data in [None, [None], [{'kind': 'click', 'x': 1}], [{'kind': 'scroll', 'delta': 11}],
+                     [{'kind': 'click'}], [{'kind': 'zoom'}], [{'kind': 1}], [{'kind': True}], ['click'],
+                     [{'kind': 'click', 'delta': 1}], [{'kind': {}}]]:
+            expected = _run(json_incoming.convert, schema3, data, ROOT)
+            actual = _run(compile_incoming(schema3), data, ROOT)
+            self.assertEqual(expected, actual)
+
+class TestMergeFilters(unittest.TestCase):
+    def test_merge_length(self):
+        merged = merge_filters((NotNull, MinLength(2), MaxLength(4), Trim))
+        self.assertEqual(['NotNull', 'LengthRange', 'Trim'], [x.name for x in merged])
+        self.assertEqual((2, 4), merged[1].params)
+
+    def test_merge_range(self):
+        merged = merge_filters((Maximum(10), Minimum(1)))
+        self.assertEqual(['Range'], [x.name for x in merged])
+        self.assertEqual((1, 10), merged[0].params)
+
+    def test_not_adjacent(self):
+        merged = merge_filters((MinLength(2), Pattern('^a'), MaxLength(4)))
+        self.assertEqual(['MinLength', 'Pattern', 'MaxLength'], [x.name for x in merged])
+
+    def test_conflicting_bounds(self):
+        merged = merge_filters((MaxLength(2), MinLength(4)))
+        self.assertEqual(['MaxLength', 'MinLength'], [x.name for x in merged])
+
+    def test_same_errors(self):
+        schema = JsonObject(JsonField('name', JsonString, MaxLength(4), MinLength(2)),
+                            JsonField('level', JsonArray(JsonInteger, Minimum(0), Maximum(3))))
+        for data in [{'name': 'a'}, {'name': 'abcde'}, {'name': 'abc', 'level': [0, 3, 4]}, {'level': [-1]},
+                     {'level': [None, 1]}]:
+            expected = _run(json_incoming.convert, schema, data, ROOT)
+            actual = _run(compile_incoming(schema), data, ROOT)
+            self.assertEqual(expected, actual)
+
+
+schema4 = JsonObject(
+    JsonField('code', JsonString, NotNull, MinLength(1), MaxLength(3), Pattern('^x'), Only('x', 'xy', 'xyz')),
+    JsonField('name', JsonString, NotEmpty, Pattern('^[a-z]*$')),
+    JsonField('level', JsonInteger, ExclusiveMinimum(0), ExclusiveMaximum(5)),
+    JsonField('ratio', JsonNumber, Range(0, 1.5), Maximum(float('inf'))),
+    JsonField('flag', JsonBoolean, NotNull),
+    JsonField('trimmed', JsonString, Trim, MaxLength(2)),
+)
+
+
+class TestInlinePipeline(unittest.TestCase):
+    def test_same_as_convert(self):
+        valid = {'code': 'xy', 'name': 'abc', 'level': 1, 'ratio': 0.5, 'flag': False, 'trimmed': ' ab '}
+        for change in [{}, {'code': None}, {'code': ''}, {'code': 'xyzw'}, {'code': 'ab'}, {'code': 'xx'},
+                       {'code': 5}, {'name': None}, {'name': ''}, {'name': 'A'}, {'level': 0}, {'level': 5},
+                       {'level': 1.0}, {'level': True}, {'ratio': -1}, {'ratio': 1.6}, {'ratio': 'a'},
+                       {'flag': None}, {'flag': 0}, {'trimmed': ' abc '}, {'trimmed': 1}]:
+            data = dict(valid)
+            data.update(change)
+            expected = _run(json_incoming.convert, schema4, data, ROOT)
+            actual = _run(compile_incoming(schema4), data, ROOT)
+            self.assertEqual(expected, actual)
+
+schema5 = JsonObject(
+    JsonField('node', JsonString, MaxLength(6)),
+    JsonField('user', JsonArray(JsonString, MaxLength(6))),
+    JsonField('level', JsonArray(JsonInteger, Range(0, 5))),
+    JsonField('spec', JsonStringMap),
+    JsonField('tag', JsonObject(JsonField('name', JsonString, Trim))),
+)
+
+
+class TestPassthrough(unittest.TestCase):
+    def test_same_as_convert(self):
+        full = {'node': 'a', 'user': ['ab'], 'level': [1, 2], 'spec': {'a': 'b'}, 'tag': {'name': 'x'}}
+        for data in [full, {'node': 'a'}, {'node': 'a', 'user': ['abcdefg']}, {'level': [1, 6]},
+                     {'node': 'a', 'user': None, 'level': None, 'spec': None, 'xxx': None},
+                     {'tag': {'name': ' x '}}, {'level': [1, None, 'a']}, None]:
+            expected = _run(json_incoming.convert, schema5, data, ROOT)
+            actual = _run(compile_incoming(schema5, passthrough=True), data, ROOT)
+            self.assertEqual(expected, actual)
+
+    def test_returns_input_objects(self):
+        data = {'node': 'a', 'user': ['ab'], 'level': [1, 2], 'spec': {'a': 'b'}, 'tag': {'name': 'x'}}
+        self.assertIs(data, compile_incoming(schema5, passthrough=True)(data))
+
+    def test_copies_missing_fields(self):
+        data = {'node': 'a', 'user': ['ab'], 'level': [1, 2], 'spec': {'a': 'b'}, 'tag': {}}
+        result = compile_incoming(schema5, passthrough=True)(data)
+        self.assertIsNot(data, result)
+        self.assertEqual({'name': None}, result['tag'])
+        self.assertIs(data['user'], result['user'])
+        self.assertIs(data['spec'], result['spec'])
+
+    def test_copies_changed_values(self):
+        data = {'node': 'a', 'user': ['ab'], 'level': [1], 'spec': {}, 'tag': {'name': ' x '}}
+        result = compile_incoming(schema5, passthrough=True)(data)
+        self.assertEqual({'name': 'x'}, result['tag'])
+        self.assertEqual({'name': ' x '}, data['tag'])
+        self.assertIs(data['level'], result['level'])
+
+    def test_array_copied_from_changed_element(self):
+        schema = JsonArray(JsonString, Trim)
+        data = ['a', ' b ', 'c']
+        result = compile_incoming(schema, passthrough=True)(data)
+        self.assertEqual(['a', 'b', 'c'], result)
+        self.assertEqual(['a', ' b ', 'c'], data)
+
+    def test_default_copies(self):
+        data = {'user': ['ab']}
+        result = compile_incoming(schema5)(data)
+        self.assertIsNot(data['user'], result['user'])
+
+
+comment_ref = JsonRef('Comment')
+schema_comment = bind_ref(comment_ref, JsonObject(
+    JsonField('text', JsonString, NotNull, MaxLength(10)),
+    JsonField('replies', JsonArray(comment_ref)),
+))
+
+THREAD = {'text': 'a', 'replies': [{'text': 'b'}, {'text': 'c', 'replies': [{'text': 'd', 'replies': []}]}]}
+
+
+class TestCompileRef(unittest.TestCase):
+    def test_same_as_convert(self):
+        converter = compile_incoming(schema_comment)
+        for data in [THREAD, None, {'replies': [{'text': 'x', 'replies': [{'text': 'abcdefghijk'}]}]},
+                     {'text': 'a', 'replies': [{'text': 'b', 'replies': [{'other': 1}]}]},
+                     {'text': 'a', 'replies': [{'text': 'b', 'replies': 'abc'}]}]:
+            self.assertEqual(_run(json_incoming.convert, schema_comment, data, ROOT), _run(converter, data, ROOT))
+
+    def test_ref_in_either(self):
+        schema = JsonObject(JsonField('value', JsonEither(JsonString, comment_ref)))
+        converter = compile_incoming(schema)
+        for data in [{'value': 'a'}, {'value': THREAD}, {'value': 5}]:
+            self.assertEqual(_run(json_incoming.convert, schema, data), _run(converter, data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,12 @@ from src import json_incoming
 
 ROOT = ['root']
 
+
+class IncomingBackend:
+    def convert(self, schema, data, path=None):
+        return json_incoming.convert(schema, data, path)
+
+
 schema1 = JsonObject(
     JsonField('node', JsonString, MaxLength(6)),
     JsonField('user', JsonArray(JsonString, MaxLength(6))),
@@ -18,11 +24,11 @@ schema1 = JsonObject(
 )
 
 
-class TestSchema1(unittest.TestCase):
+class TestSchema1(IncomingBackend, unittest.TestCase):
     def test_integer_in_string_field(self):
         data = {'node': 5}
         try:
-            json_incoming.convert(schema1, data)
+            self.convert(schema1, data)
             self.assertTrue(False)
         except TypeError as ex:
             self.assertEqual('node: Should be a string', ex.args[0])
@@ -33,13 +39,13 @@ class TestSchema1(unittest.TestCase):
                     'user': ['abc', 'def', 'xxxxxx'],
                     'tag': None,
                     'event': None}
-        result = json_incoming.convert(schema1, data)
+        result = self.convert(schema1, data)
         self.assertEqual(expected, result)
 
     def test_array_element_type_mismatch(self):
         data = {'user': ['abc', 5, 'xxxxxxx']}
         try:
-            json_incoming.convert(schema1, data)
+            self.convert(schema1, data)
             self.assertTrue(False)
         except TypeError as ex:
             self.assertEqual('user.1: Should be a string', ex.args[0])
@@ -47,7 +53,7 @@ class TestSchema1(unittest.TestCase):
     def test_too_big(self):
         data = {'tag': {'name': 'abc', 'level': 4}}
         try:
-            json_incoming.convert(schema1, data)
+            self.convert(schema1, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('tag.level: Value is too large', ex.args[0])
@@ -55,7 +61,7 @@ class TestSchema1(unittest.TestCase):
     def test_string_in_object_field(self):
         data = {'tag': 'abc'}
         try:
-            json_incoming.convert(schema1, data)
+            self.convert(schema1, data)
             self.assertTrue(False)
         except TypeError as ex:
             self.assertEqual('tag: Should be an object', ex.args[0])
@@ -66,13 +72,13 @@ class TestSchema1(unittest.TestCase):
                     'user': None,
                     'tag': {'name': 'abc', 'level': None},
                     'event': None}
-        result = json_incoming.convert(schema1, data)
+        result = self.convert(schema1, data)
         self.assertEqual(expected, result)
 
     def test_array_element_too_long(self):
         data = {'event': [{'name': 'abcd', 'alarm': True}, {'name': 'def', 'alarm': False}]}
         try:
-            json_incoming.convert(schema1, data)
+            self.convert(schema1, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('event.0.name: String is too long', ex.args[0])
@@ -83,13 +89,13 @@ class TestSchema1(unittest.TestCase):
                     'user': None,
                     'tag': None,
                     'event': [{'name': 'abc', 'alarm': None}, {'name': None, 'alarm': False}]}
-        result = json_incoming.convert(schema1, data)
+        result = self.convert(schema1, data)
         self.assertEqual(expected, result)
 
     def test_object_in_array_field(self):
         data = {'node': '5', 'user': {'abc': 123}}
         try:
-            json_incoming.convert(schema1, data)
+            self.convert(schema1, data)
             self.assertTrue(False)
         except TypeError as ex:
             self.assertEqual('user: Should be an array', ex.args[0])
@@ -104,15 +110,15 @@ schema2 = JsonObject(
 )
 
 
-class TestSchema2(unittest.TestCase):
+class TestSchema2(IncomingBackend, unittest.TestCase):
     def test_all_none(self):
         data = {'node': None, 'user': None, 'tag': None}
-        result = json_incoming.convert(schema2, data, ROOT)
+        result = self.convert(schema2, data, ROOT)
         self.assertEqual(data, result)
 
     def test_none_inside(self):
         data = {'node': 'abc', 'user': ['def', None, 'f'], 'tag': {'name': None, 'level': 2}}
-        result = json_incoming.convert(schema2, data)
+        result = self.convert(schema2, data)
         self.assertEqual(data, result)
 
 
@@ -121,11 +127,11 @@ schema3 = JsonObject(
 )
 
 
-class TestSchema3(unittest.TestCase):
+class TestSchema3(IncomingBackend, unittest.TestCase):
     def test_null(self):
         data = {'node': None}
         try:
-            json_incoming.convert(schema3, data)
+            self.convert(schema3, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('node: Cannot be null', ex.args[0])
@@ -133,7 +139,7 @@ class TestSchema3(unittest.TestCase):
     def test_two_filters(self):
         data = {'node': 'abcde'}
         try:
-            json_incoming.convert(schema3, data)
+            self.convert(schema3, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('node: String is too long', ex.args[0])
@@ -141,7 +147,7 @@ class TestSchema3(unittest.TestCase):
     def test_redundant_field(self):
         data = {'node': 'abcd', 'xxx': 6}
         try:
-            json_incoming.convert(schema3, data)
+            self.convert(schema3, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('Unrecognized field: xxx', ex.args[0])
@@ -149,7 +155,7 @@ class TestSchema3(unittest.TestCase):
     def test_two_redundant_fields(self):
         data = {'node': 'abcd', 'xxx': 6, 'yyy': 11.1}
         try:
-            json_incoming.convert(schema3, data, ROOT)
+            self.convert(schema3, data, ROOT)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertTrue('root: Unrecognized fields: xxx, yyy' == ex.args[0] or 'root: Unrecognized fields: yyy, xxx' == ex.args[0])
@@ -160,18 +166,18 @@ schema4 = JsonArray(JsonObject(
 ))
 
 
-class TestSchema4(unittest.TestCase):
+class TestSchema4(IncomingBackend, unittest.TestCase):
     def test_array_of_object(self):
         data = [{'arrayOfObject': 'def'}, {'arrayOfObject': 'abcde'}]
         try:
-            json_incoming.convert(schema4, data)
+            self.convert(schema4, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('1.arrayOfObject: String is too long', ex.args[0])
 
     def test_return_array(self):
         data = [{'arrayOfObject': 'def'}, {'arrayOfObject': 'abce'}]
-        result = json_incoming.convert(schema4, data)
+        result = self.convert(schema4, data)
         self.assertEqual(data, result)
 
 
@@ -181,11 +187,11 @@ schema5 = JsonObject(
 )
 
 
-class TestSchema5(unittest.TestCase):
+class TestSchema5(IncomingBackend, unittest.TestCase):
     def test_empty_array(self):
         data = {'node': 'abc'}
         try:
-            json_incoming.convert(schema5, data)
+            self.convert(schema5, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('event_id: Cannot be null', ex.args[0])
@@ -197,11 +203,11 @@ schema6 = JsonObject(
 )
 
 
-class TestSchema6(unittest.TestCase):
+class TestSchema6(IncomingBackend, unittest.TestCase):
     def test_string_in_string_map_field(self):
         data = {'name': 1.99, 'spec': 'def'}
         try:
-            json_incoming.convert(schema6, data)
+            self.convert(schema6, data)
             self.assertTrue(False)
         except TypeError as ex:
             self.assertEqual('spec: Should be an object', ex.args[0])
@@ -209,14 +215,14 @@ class TestSchema6(unittest.TestCase):
     def test_integer_in_string_map(self):
         data = {'name': 1.99, 'spec': {'def': 1, 'size': 'xyz'}}
         try:
-            json_incoming.convert(schema6, data)
+            self.convert(schema6, data)
             self.assertTrue(False)
         except TypeError as ex:
             self.assertEqual('spec.def: Should be a string', ex.args[0])
 
     def test_return_number_and_string_map(self):
         data = {'name': 1.99, 'spec': {'def': "1", 'size': 'xyz'}}
-        result = json_incoming.convert(schema6, data)
+        result = self.convert(schema6, data)
         self.assertEqual(data, result)
 
 
@@ -225,22 +231,22 @@ schema7 = JsonObject(
 )
 
 
-class TestSchema7(unittest.TestCase):
+class TestSchema7(IncomingBackend, unittest.TestCase):
     def test_string(self):
         data = {'amount': '1.11'}
-        result = json_incoming.convert(schema7, data)
+        result = self.convert(schema7, data)
         self.assertEqual(data, result)
 
     def test_number(self):
         data = {'amount': 1.11}
-        result = json_incoming.convert(schema7, data)
+        result = self.convert(schema7, data)
         expected = {'amount': '1.11'}
         self.assertEqual(expected, result)
 
     def test_not_number_nor_string(self):
         data = {'amount': True}
         try:
-            json_incoming.convert(schema7, data, ROOT)
+            self.convert(schema7, data, ROOT)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('root.amount: Invalid value', ex.args[0])
@@ -258,26 +264,26 @@ schema8 = JsonObject(
 )
 
 
-class TestSchema8(unittest.TestCase):
+class TestSchema8(IncomingBackend, unittest.TestCase):
     def test_string(self):
         data = {'credential': 'xyc'}
-        result = json_incoming.convert(schema8, data)
+        result = self.convert(schema8, data)
         self.assertEqual(data, result)
 
     def test_object1(self):
         data = {'credential': {'userId': 5, 'password': 'abcde'}}
-        result = json_incoming.convert(schema8, data)
+        result = self.convert(schema8, data)
         self.assertEqual(data, result)
 
     def test_object2(self):
         data = {'credential': {'email': 'abc', 'passphrase': 'abcdef'}}
-        result = json_incoming.convert(schema8, data)
+        result = self.convert(schema8, data)
         self.assertEqual(data, result)
 
     def test_type_mismatch(self):
         data = {'credential': 3.5}
         try:
-            json_incoming.convert(schema8, data)
+            self.convert(schema8, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('credential: Invalid value', ex.args[0])
@@ -285,7 +291,7 @@ class TestSchema8(unittest.TestCase):
     def test_validation_failed(self):
         data = {'credential': {'userId': 5, 'password': 'abc'}}
         try:
-            json_incoming.convert(schema8, data)
+            self.convert(schema8, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('credential: Invalid value', ex.args[0])
@@ -303,25 +309,252 @@ schema9 = JsonEither(
 )
 
 
-class TestSchema9(unittest.TestCase):
+class TestSchema9(IncomingBackend, unittest.TestCase):
     def test_object1(self):
         data = {'userId': 5, 'password': 'abcde'}
-        result = json_incoming.convert(schema9, data)
+        result = self.convert(schema9, data)
         self.assertEqual(data, result)
 
     def test_object2(self):
         data = {'email': 'abc', 'passphrase': 'abcdef'}
-        result = json_incoming.convert(schema9, data)
+        result = self.convert(schema9, data)
         self.assertEqual(data, result)
 
     def test_invalid(self):
         data = {'userId': 5, 'passphrase': 'abcdef'}
         try:
-            json_incoming.convert(schema9, data)
+            self.convert(schema9, data)
             self.assertTrue(False)
         except ValueError as ex:
             self.assertEqual('Invalid value', ex.args[0])
 
 
+class TestFieldIndex(unittest.TestCase):
+    def test_field_index(self):
+        self.assertEqual(frozenset(['node', 'user', 'tag']), schema2['field_names'])
+        self.assertIs(schema2['fields'][2], schema2['field_map']['tag'])
+
+    def test_redundancy_does_not_mutate_input(self):
+        data = {'node': 'abc', 'xxx': 1}
+        try:
+            json_incoming.convert(schema2, data)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('Unrecognized field: xxx', ex.args[0])
+        self.assertEqual({'node': 'abc', 'xxx': 1}, data)
+
+
+class TestConvertMany(unittest.TestCase):
+    def test_all_valid(self):
+        records = [{'arrayOfObject': 'abc'}, {'arrayOfObject': 'def'}]
+        results, errors = json_incoming.convert_many(schema4['element_type'], records)
+        self.assertEqual(records, results)
+        self.assertEqual([], errors)
+
+    def test_partial_failure(self):
+        records = [{'arrayOfObject': 'abc'}, {'arrayOfObject': 'abcde'}, 'abc', {}]
+        results, errors = json_incoming.convert_many(schema4['element_type'], records)
+        self.assertEqual([{'arrayOfObject': 'abc'}, None, None, None], results)
+        self.assertEqual([1, 2, 3], [i for i, ex in errors])
+        self.assertEqual(['arrayOfObject: String is too long', 'Should be an object',
+                          'arrayOfObject: Cannot be null'], [ex.args[0] for i, ex in errors])
+        self.assertIsInstance(errors[1][1], TypeError)
+
+    def test_converter_is_cached(self):
+        json_incoming.convert_many(schema4['element_type'], [])
+        converter = json_incoming._CONVERTERS[id(schema4['element_type'])][1]
+        json_incoming.convert_many(schema4['element_type'], [{'arrayOfObject': 'abc'}])
+        self.assertIs(converter, json_incoming._CONVERTERS[id(schema4['element_type'])][1])
+
+
+schema10 = JsonObject(
+    JsonField('event', JsonTaggedUnion('kind', {
+        'click': JsonObject(JsonField('kind', JsonString), JsonField('x', JsonInteger, NotNull)),
+        'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonNumber, Range(-10, 10))),
+    }))
+)
+
+
+class TestSchema10(IncomingBackend, unittest.TestCase):
+    def test_branch(self):
+        data = {'event': {'kind': 'scroll', 'delta': 1.5}}
+        result = self.convert(schema10, data)
+        self.assertEqual(data, result)
+
+    def test_none(self):
+        result = self.convert(schema10, {})
+        self.assertEqual({'event': None}, result)
+
+    def test_error_in_branch(self):
+        data = {'event': {'kind': 'scroll', 'delta': 11}}
+        try:
+            self.convert(schema10, data, ROOT)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('root.event.delta: Value is too large', ex.args[0])
+
+    def test_field_of_other_branch(self):
+        data = {'event': {'kind': 'click', 'x': 1, 'delta': 1}}
+        try:
+            self.convert(schema10, data)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('event: Unrecognized field: delta', ex.args[0])
+
+    def test_unknown_tag(self):
+        for data in [{'event': {'kind': 'zoom'}}, {'event': {'x': 1}}, {'event': {'kind': ['click']}}]:
+            try:
+                self.convert(schema10, data)
+                self.assertTrue(False)
+            except ValueError as ex:
+                self.assertEqual('event.kind: Invalid value', ex.args[0])
+
+    def test_not_object(self):
+        try:
+            self.convert(schema10, {'event': 'click'})
+            self.assertTrue(False)
+        except TypeError as ex:
+            self.assertEqual('event: Should be an object', ex.args[0])
+
+schema11 = JsonObject(
+    JsonField('node', JsonString, NotNull, MaxLength(4)),
+    JsonField('level', JsonInteger, Range(0, 3)),
+    JsonField('user', JsonArray(JsonString, MaxLength(3))),
+    JsonField('tag', JsonObject(JsonField('name', JsonString, Pattern('^[a-z]+$')))),
+    JsonField('spec', JsonStringMap),
+)
+
+
+class TestCollectErrors(unittest.TestCase):
+    def test_valid(self):
+        data = {'node': 'abc', 'level': 1}
+        result, errors = json_incoming.collect_errors(schema11, data)
+        self.assertEqual(json_incoming.convert(schema11, data), result)
+        self.assertEqual([], errors)
+
+    def test_all_errors(self):
+        data = {'node': 'abcde', 'level': 'x', 'user': ['ab', 'abcd', 5], 'tag': {'name': 'A1', 'x': 1},
+                'spec': {'a': 1}, 'extra': True}
+        result, errors = json_incoming.collect_errors(schema11, data, ROOT)
+        self.assertIsNone(result)
+        self.assertEqual([
+            (('root',), 'unrecognized_field', 'root: Unrecognized field: extra'),
+            (('root', 'node'), 'too_long', 'root.node: String is too long'),
+            (('root', 'level'), 'not_integer', 'root.level: Should be an integer'),
+            (('root', 'user', 1), 'too_long', 'root.user.1: String is too long'),
+            (('root', 'user', 2), 'not_string', 'root.user.2: Should be a string'),
+            (('root', 'tag'), 'unrecognized_field', 'root.tag: Unrecognized field: x'),
+            (('root', 'tag', 'name'), 'pattern_mismatch', 'root.tag.name: Pattern not match'),
+            (('root', 'spec', 'a'), 'not_string', 'root.spec.a: Should be a string'),
+        ], errors)
+
+    def test_failed_field_is_not_reported_twice(self):
+        data = {'node': 5}
+        result, errors = json_incoming.collect_errors(schema11, data)
+        self.assertEqual([('node',)], [x.path for x in errors])
+        self.assertEqual('not_string', errors[0].code)
+
+    def test_max_errors(self):
+        data = {'node': 'abc', 'user': ['abcd'] * 100000}
+        result, errors = json_incoming.collect_errors(schema11, data, max_errors=10)
+        self.assertEqual(10, len(errors))
+        self.assertEqual(('user', 9), errors[-1].path)
+
+    def test_not_object(self):
+        result, errors = json_incoming.collect_errors(schema11, [])
+        self.assertEqual([((), 'not_object', 'Should be an object')], errors)
+
+    def test_custom_filter(self):
+        def _reject(value, path):
+            if value == 'bare':
+                raise ValueError()
+            if value == 'message':
+                raise ValueError('Rejected')
+            return value
+
+        schema = JsonObject(JsonField('a', JsonString, SchemaFilter('validator', 'Reject', _reject)),
+                            JsonField('b', JsonString, SchemaFilter('validator', 'Reject', _reject)))
+        result, errors = json_incoming.collect_errors(schema, {'a': 'bare', 'b': 'message'})
+        self.assertIsNone(result)
+        self.assertEqual([(('a',), 'invalid', ''), (('b',), 'invalid', 'Rejected')], errors)
+
+
+class TestInPlace(unittest.TestCase):
+    def test_same_result(self):
+        data = {'node': 'abc', 'user': ['def', None], 'tag': {'name': 'ab'}, 'event': [{'name': 'x'}]}
+        expected = json_incoming.convert(schema1, data)
+        result = json_incoming.convert(schema1, data, in_place=True)
+        self.assertEqual(expected, result)
+
+    def test_reuses_containers(self):
+        user = ['def', 'abc']
+        tag = {'name': 'ab'}
+        data = {'node': 'abc', 'user': user, 'tag': tag}
+        result = json_incoming.convert(schema1, data, in_place=True)
+        self.assertIs(data, result)
+        self.assertIs(user, result['user'])
+        self.assertIs(tag, result['tag'])
+        self.assertEqual({'name': 'ab', 'level': None}, tag)
+        self.assertIsNone(result['event'])
+
+    def test_filters_written_back(self):
+        schema = JsonObject(JsonField('amount', JsonArray(JsonEither(JsonString, JsonNumber), ToString)))
+        data = {'amount': [1.5, '2']}
+        json_incoming.convert(schema, data, in_place=True)
+        self.assertEqual({'amount': ['1.5', '2']}, data)
+
+    def test_tagged_union(self):
+        event = {'kind': 'scroll'}
+        result = json_incoming.convert(schema10, {'event': event}, in_place=True)
+        self.assertIs(event, result['event'])
+        self.assertEqual({'kind': 'scroll', 'delta': None}, event)
+
+    def test_error(self):
+        try:
+            json_incoming.convert(schema4, [{'arrayOfObject': 'def'}, {'arrayOfObject': 'abcde'}], in_place=True)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('1.arrayOfObject: String is too long', ex.args[0])
+
+
+comment_ref = JsonRef('Comment')
+schema_comment = bind_ref(comment_ref, JsonObject(
+    JsonField('text', JsonString, NotNull, MaxLength(10)),
+    JsonField('replies', JsonArray(comment_ref)),
+))
+
+THREAD = {'text': 'a', 'replies': [{'text': 'b'}, {'text': 'c', 'replies': [{'text': 'd', 'replies': []}]}]}
+
+
+class TestRef(unittest.TestCase):
+    def test_nested(self):
+        expected = {'text': 'a', 'replies': [{'text': 'b', 'replies': None},
+                                             {'text': 'c', 'replies': [{'text': 'd', 'replies': []}]}]}
+        self.assertEqual(expected, json_incoming.convert(schema_comment, THREAD))
+
+    def test_deep_error(self):
+        data = {'text': 'a', 'replies': [{'text': 'b', 'replies': [{'text': 'abcdefghijk'}]}]}
+        try:
+            json_incoming.convert(schema_comment, data)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('replies.0.replies.0.text: String is too long', ex.args[0])
+
+    def test_in_place_and_collect(self):
+        data = {'text': 'a', 'replies': [{'text': None}, {'text': 'b', 'xxx': 1}]}
+        result, errors = json_incoming.collect_errors(schema_comment, data)
+        self.assertEqual([('replies', 0, 'text'), ('replies', 1)], [x.path for x in errors])
+        replies = [{'text': 'b'}]
+        result = json_incoming.convert(schema_comment, {'text': 'a', 'replies': replies}, in_place=True)
+        self.assertIs(replies[0], result['replies'][0])
+
+    def test_unbound(self):
+        try:
+            json_incoming.convert(JsonObject(JsonField('node', JsonRef('Node'))), {'node': {}})
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('Unbound reference: Node', ex.args[0])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+from src.json_schema_dsl import *
+from src.validators import *
+from src.filters import *
+from src import json_incoming
+from src import json_outgoing
+from src import json_iterative
+
+ROOT = ['root']
+
+schema1 = JsonObject(
+    JsonField('node', JsonString, NotNull, MaxLength(6)),
+    JsonField('user', JsonArray(JsonString, MaxLength(6))),
+    JsonField('tag', JsonObject(JsonField('name', JsonString, Trim, MaxLength(4)),
+                                JsonField('level', JsonInteger, Range(0, 3)))),
+    JsonField('amount', JsonEither(JsonString, JsonNumber), ToString),
+    JsonField('credential', JsonEither(
+        JsonObject(JsonField('token', JsonString, NotNull)),
+        JsonArray(JsonEither(JsonInteger, JsonObject(JsonField('email', JsonString, NotNull)))),
+    )),
+    JsonField('spec', JsonStringMap),
+    JsonField('event', JsonTaggedUnion('kind', {
+        'click': JsonObject(JsonField('kind', JsonString), JsonField('x', JsonInteger, NotNull)),
+        'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonNumber)),
+    }))
+)
+
+INCOMING = [
+    None,
+    {},
+    {'node': 'abc'},
+    {'node': 5},
+    {'node': 'abc', 'xxx': 1},
+    {'node': 'abc', 'user': ['a', None, 'abcdefg']},
+    {'node': 'abc', 'user': 'a'},
+    {'node': 'abc', 'tag': {'name': ' ab ', 'level': 3}, 'amount': 1.5},
+    {'node': 'abc', 'tag': {'name': 'abcde'}},
+    {'node': 'abc', 'amount': True},
+    {'node': 'abc', 'credential': {'token': 't'}},
+    {'node': 'abc', 'credential': {}},
+    {'node': 'abc', 'credential': [1, {'email': 'e'}, 2]},
+    {'node': 'abc', 'credential': [1, {'email': None}]},
+    {'node': 'abc', 'spec': {'a': 'b'}, 'event': {'kind': 'click', 'x': 1}},
+    {'node': 'abc', 'spec': {'a': 1}},
+    {'node': 'abc', 'event': {'kind': 'click'}},
+    {'node': 'abc', 'event': {'kind': 'drag'}},
+    [],
+]
+
+schema2 = JsonObject(
+    JsonField('node', JsonString, ToString),
+    JsonField('user', JsonArray(JsonString, ToString)),
+    JsonField('tag', JsonObject(JsonField('name', JsonString), JsonField('level', JsonInteger))),
+    JsonField('owner', JsonString, NotNull),
+    JsonField('extra', JsonAny),
+    JsonField('event', JsonTaggedUnion('kind', {
+        'click': JsonObject(JsonField('kind', JsonString), JsonField('x', JsonInteger)),
+    }))
+)
+
+OUTGOING = [
+    None,
+    {},
+    {'owner': 'o', 'node': 5, 'xxx': 1},
+    {'owner': 'o', 'user': [1, None, 'b'], 'tag': {'name': 'n', 'xxx': 1}, 'extra': {'a': [1]}},
+    {'owner': 'o', 'tag': {'level': 'abc'}},
+    {'owner': 'o', 'user': {'a': 1}},
+    {'owner': 'o', 'event': {'kind': 'click', 'x': 1}},
+    {'owner': 'o', 'event': {'kind': 'drag'}},
+    'abc',
+]
+
+node_ref = JsonRef('Node')
+schema_tree = bind_ref(node_ref, JsonObject(
+    JsonField('name', JsonString, NotNull),
+    JsonField('children', JsonArray(node_ref)),
+))
+
+
+def _run(converter, *args):
+    try:
+        return 'result', converter(*args)
+    except (ValueError, TypeError) as ex:
+        return type(ex), ex.args[0]
+
+
+def _deep_tree(depth):
+    tree = {'name': 'leaf'}
+    for i in range(depth - 1):
+        tree = {'name': str(i), 'children': [tree]}
+    return tree
+
+
+def _depth(tree):
+    depth = 0
+    while tree:
+        depth += 1
+        tree = (tree.get('children') or [None])[0]
+    return depth
+
+
+class TestConvertIncoming(unittest.TestCase):
+    def test_same_as_convert(self):
+        for data in INCOMING:
+            expected = _run(json_incoming.convert, schema1, data, ROOT)
+            self.assertEqual(expected, _run(json_iterative.convert_incoming, schema1, data, ROOT))
+
+    def test_deep_nesting(self):
+        result = json_iterative.convert_incoming(schema_tree, _deep_tree(5000), max_depth=None)
+        self.assertEqual(5000, _depth(result))
+
+    def test_max_depth(self):
+        self.assertEqual(5, _depth(json_iterative.convert_incoming(schema_tree, _deep_tree(5), max_depth=9)))
+        try:
+            json_iterative.convert_incoming(schema_tree, _deep_tree(5), max_depth=8)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('too_deep', ex.code)
+            self.assertEqual(8, ex.constraint)
+            self.assertEqual('children.0.children.0.children.0.children.0: Nesting is too deep', ex.args[0])
+
+    def test_max_depth_inside_either(self):
+        schema = JsonEither(JsonString, schema_tree)
+        try:
+            json_iterative.convert_incoming(schema, _deep_tree(20), max_depth=8)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('too_deep', ex.code)
+
+
+class TestConvertOutgoing(unittest.TestCase):
+    def test_same_as_convert(self):
+        for data in OUTGOING:
+            expected = _run(json_outgoing.convert, schema2, data, ROOT)
+            self.assertEqual(expected, _run(json_iterative.convert_outgoing, schema2, data, ROOT))
+
+    def test_generator(self):
+        data = {'owner': 'o', 'user': (x for x in [1, 2])}
+        self.assertEqual({'owner': 'o', 'user': ['1', '2']}, json_iterative.convert_outgoing(schema2, data))
+
+    def test_deep_nesting(self):
+        result = json_iterative.convert_outgoing(schema_tree, _deep_tree(5000), max_depth=None)
+        self.assertEqual(5000, _depth(result))
+
+    def test_max_depth(self):
+        try:
+            json_iterative.convert_outgoing(schema_tree, _deep_tree(3000))
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('too_deep', ex.code)
+            self.assertEqual(json_iterative.DEFAULT_MAX_DEPTH, ex.constraint)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import pickle
+import unittest
+from src.json_schema_dsl import *
+from src.validators import *
+from src.filters import *
+from src import json_incoming
+from src.json_parallel import parallel_convert
+
+schema1 = JsonObject(
+    JsonField('node', JsonString, NotNull, MaxLength(6), Pattern('^[a-z]+$')),
+    JsonField('level', JsonInteger, Range(0, 3)),
+    JsonField('kind', JsonString, Trim, Only('a', 'b')),
+    JsonField('user', JsonArray(JsonString, MinLength(2))),
+)
+
+
+class TestPickle(unittest.TestCase):
+    def test_validator_round_trip(self):
+        for validator in [NotNull, NotEmpty, MaxLength(3), MinLength(1), LengthRange(1, 3), Only('a', 'b'),
+                          Minimum(1), ExclusiveMinimum(1), Maximum(5), ExclusiveMaximum(5), Range(1, 5),
+                          Pattern('^a')]:
+            restored = pickle.loads(pickle.dumps(validator))
+            self.assertEqual(validator.name, restored.name)
+            self.assertEqual(validator.params, restored.params)
+
+    def test_restored_validator_checks(self):
+        restored = pickle.loads(pickle.dumps(Range(0, 3)))
+        self.assertEqual(3, restored(3, []))
+        try:
+            restored(4, ['level'])
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('level: Value is too large', ex.args[0])
+
+    def test_schema_round_trip(self):
+        restored = pickle.loads(pickle.dumps(schema1))
+        data = {'node': 'abc', 'level': 2, 'kind': ' a ', 'user': ['ab']}
+        self.assertEqual(json_incoming.convert(schema1, data), json_incoming.convert(restored, data))
+
+
+class TestParallelConvert(unittest.TestCase):
+    def test_results_in_order(self):
+        records = [{'node': 'abc', 'level': i % 4} for i in range(100)]
+        expected = [json_incoming.convert(schema1, x) for x in records]
+        actual = list(parallel_convert(schema1, iter(records), workers=2, chunksize=7))
+        self.assertEqual(expected, actual)
+
+    def test_errors_do_not_stop_the_run(self):
+        records = [{'node': 'abc'}, {'node': 'abc', 'level': 5}, {'node': 5}, {'node': 'def'}]
+        results = list(parallel_convert(schema1, records, workers=2, chunksize=1))
+        self.assertEqual(json_incoming.convert(schema1, records[0]), results[0])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual('level: Value is too large', results[1].args[0])
+        self.assertEqual(('level',), results[1].path)
+        self.assertIsInstance(results[2], TypeError)
+        self.assertEqual('node: Should be a string', results[2].args[0])
+        self.assertEqual(json_incoming.convert(schema1, records[3]), results[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
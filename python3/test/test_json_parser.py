@@ -0,0 +1,154 @@
+import json
+import unittest
+from src.json_schema_dsl import *
+from src.validators import *
+from src.filters import *
+from src import json_incoming
+from src import json_parser
+
+ROOT = ['root']
+
+schema1 = JsonObject(
+    JsonField('node', JsonString, NotNull, MaxLength(6)),
+    JsonField('user', JsonArray(JsonString, MaxLength(6))),
+    JsonField('tag', JsonObject(JsonField('name', JsonString, MaxLength(4)),
+                                JsonField('level', JsonInteger, Range(0, 3)),
+                                )),
+    JsonField('amount', JsonEither(JsonString, JsonNumber), ToString),
+    JsonField('spec', JsonStringMap),
+    JsonField('event', JsonTaggedUnion('kind', {
+        'click': JsonObject(JsonField('kind', JsonString), JsonField('x', JsonInteger, NotNull)),
+        'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonNumber)),
+    }))
+)
+
+VALID = [
+    {'node': 'abc'},
+    {'node': 'abc', 'user': [], 'tag': {}},
+    {'node': 'abc', 'user': ['a', 'bcd', None], 'tag': {'name': 'ab', 'level': 3}, 'amount': 1.5},
+    {'node': 'abc', 'spec': {'a': 'b'}, 'event': {'x': 1, 'kind': 'click'}, 'amount': '2'},
+]
+
+INVALID = [
+    {},
+    {'node': 5},
+    {'node': 'abcdefg'},
+    {'node': 'abc', 'user': 'abc'},
+    {'node': 'abc', 'user': ['abc', 5]},
+    {'node': 'abc', 'tag': []},
+    {'node': 'abc', 'tag': {'level': 4}},
+    {'node': 'abc', 'tag': {'other': 4}},
+    {'node': 'abc', 'other': 1},
+    {'x': 1, 'y': 2},
+    {'amount': True},
+    {'user': ['abc', 5], 'node': 'abcdefg'},
+    {'tag': {'level': 4, 'x': 1}, 'node': 'abc'},
+    {'x': 1, 'node': 'abc', 'y': 2, 'tag': {'level': 1, 'z': 1}, 'x1': 3},
+    {'node': 'abc', 'amount': True},
+    {'node': 'abc', 'spec': {'a': 1}},
+    {'node': 'abc', 'event': {'kind': 'drag'}},
+    {'node': 'abc', 'event': {'kind': 'click'}},
+]
+
+
+fused_loads = json_parser.compile_parser(schema1, fuse_threshold=0)
+
+
+class TestLoadsValidated(unittest.TestCase):
+    def assert_same(self, data):
+        expected = json_incoming.convert(schema1, data, ROOT)
+        body = json.dumps(data)
+        self.assertEqual(expected, json_parser.loads_validated(schema1, body, ROOT))
+        self.assertEqual(expected, json_parser.loads_validated(schema1, body.encode('utf-8'), ROOT))
+        self.assertEqual(expected, fused_loads(body, ROOT))
+        self.assertEqual(expected, fused_loads(body.encode('utf-8'), ROOT))
+
+    def assert_same_error(self, data):
+        try:
+            json_incoming.convert(schema1, data, ROOT)
+            self.assertTrue(False)
+        except (ValueError, TypeError) as ex:
+            expected = ex
+        for loads in [lambda body, path: json_parser.loads_validated(schema1, body, path), fused_loads]:
+            try:
+                loads(json.dumps(data, indent=1), ROOT)
+                self.assertTrue(False)
+            except (ValueError, TypeError) as ex:
+                self.assertEqual(type(expected), type(ex))
+                self.assertEqual(expected.args[0], ex.args[0])
+
+    def test_valid(self):
+        for data in VALID:
+            self.assert_same(data)
+
+    def test_invalid(self):
+        for data in INVALID:
+            self.assert_same_error(data)
+
+    def test_whitespace(self):
+        body = b' \n{ "node" : "abc" , "user" : [ "a" , "b" ] , "tag" : { } }\n'
+        expected = {'node': 'abc', 'user': ['a', 'b'], 'tag': {'name': None, 'level': None},
+                    'amount': None, 'spec': None, 'event': None}
+        self.assertEqual(expected, json_parser.loads_validated(schema1, body))
+        self.assertEqual(expected, fused_loads(body))
+
+    def test_schema_error_in_broken_body(self):
+        body = '{"other": 1, "node": "abc", "user": [' + ', '.join(['"x"'] * 10) + ', BROKEN'
+        for loads in [lambda body: json_parser.loads_validated(schema1, body), fused_loads]:
+            try:
+                loads(body)
+                self.assertTrue(False)
+            except json.JSONDecodeError:
+                pass
+
+    def test_syntax_errors(self):
+        for body in ['', '{"node": "abc"', '{"node" "abc"}', '{"node": "abc",}', '{"node": "abc"} x',
+                     '{node: 1}', '{"node": "abc", "user": ["a" "b"]}', '{"node": "abc", "tag": [}']:
+            for loads in [lambda body: json_parser.loads_validated(schema1, body), fused_loads]:
+                try:
+                    loads(body)
+                    self.assertTrue(False)
+                except json.JSONDecodeError:
+                    pass
+
+    def test_null_document(self):
+        self.assertIsNone(json_parser.loads_validated(schema1, 'null'))
+        self.assertIsNone(fused_loads('null'))
+
+    def test_compiled_parser_is_cached(self):
+        self.assertIs(json_parser.compile_cached(schema1, json_parser._PARSERS, json_parser.compile_parser),
+                      json_parser.compile_cached(schema1, json_parser._PARSERS, json_parser.compile_parser))
+
+    def test_array_schema(self):
+        schema = JsonArray(JsonObject(JsonField('name', JsonString, NotNull, MaxLength(4))))
+        loads = json_parser.compile_parser(schema, fuse_threshold=0)
+        self.assertEqual([{'name': 'abc'}, {'name': 'de'}], loads('[{"name": "abc"}, {"name": "de"}]'))
+        try:
+            loads('[{"name": "abc"}, {"name": "abcde"}]')
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('1.name: String is too long', ex.args[0])
+
+
+comment_ref = JsonRef('Comment')
+schema_comment = bind_ref(comment_ref, JsonObject(
+    JsonField('text', JsonString, NotNull, MaxLength(10)),
+    JsonField('replies', JsonArray(comment_ref)),
+))
+
+THREAD = {'text': 'a', 'replies': [{'text': 'b'}, {'text': 'c', 'replies': [{'text': 'd', 'replies': []}]}]}
+
+
+class TestRef(unittest.TestCase):
+    def test_same_as_convert(self):
+        loads = json_parser.compile_parser(schema_comment, fuse_threshold=0)
+        self.assertEqual(json_incoming.convert(schema_comment, THREAD), loads(json.dumps(THREAD)))
+        try:
+            loads('{"text": "a", "replies": [{"text": "b", "replies": [{"other": 1}]}]}')
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('replies.0.replies.0: Unrecognized field: other', ex.args[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import io
+import json
+import unittest
+from src.json_schema_dsl import *
+from src.validators import *
+from src import json_stream
+
+schema1 = JsonObject(
+    JsonField('node', JsonString, NotNull, MaxLength(6)),
+    JsonField('level', JsonInteger, Range(0, 3)),
+)
+
+NDJSON = b'{"node": "abc", "level": 1}\n' \
+         b'{"node": "abcdefg"}\n' \
+         b'\n' \
+         b'{"node": \n' \
+         b'{"node": "xyz", "level": 3}\r\n' \
+         b'{"node": "last"}'
+
+
+class TestValidateNdjson(unittest.TestCase):
+    def test_results_and_errors(self):
+        results = list(json_stream.validate_ndjson(schema1, io.BytesIO(NDJSON), buffer_size=7))
+        self.assertEqual([1, 2, 4, 5, 6], [line_no for line_no, result in results])
+        self.assertEqual({'node': 'abc', 'level': 1}, results[0][1])
+        self.assertEqual('node: String is too long', results[1][1].args[0])
+        self.assertIsInstance(results[2][1], ValueError)
+        self.assertEqual({'node': 'xyz', 'level': 3}, results[3][1])
+        self.assertEqual({'node': 'last', 'level': None}, results[4][1])
+
+    def test_skip_invalid(self):
+        validator = json_stream.validate_ndjson(schema1, io.BytesIO(NDJSON), skip_invalid=True)
+        results = list(validator)
+        self.assertEqual([1, 5, 6], [line_no for line_no, result in results])
+        self.assertEqual(2, validator.skipped)
+
+    def test_buffer_sizes(self):
+        expected = list(json_stream.validate_ndjson(schema1, io.BytesIO(NDJSON), skip_invalid=True))
+        for buffer_size in [1, 2, 3, 28, 1000]:
+            stream = io.BytesIO(NDJSON)
+            actual = list(json_stream.validate_ndjson(schema1, stream, buffer_size, skip_invalid=True))
+            self.assertEqual(expected, actual)
+
+    def test_empty(self):
+        self.assertEqual([], list(json_stream.validate_ndjson(schema1, io.BytesIO(b''))))
+
+    def test_iterator(self):
+        validator = json_stream.validate_ndjson(schema1, io.BytesIO(NDJSON), skip_invalid=True)
+        self.assertEqual((1, {'node': 'abc', 'level': 1}), next(validator))
+        self.assertIs(validator, iter(validator))
+        self.assertEqual([5, 6], [line_no for line_no, result in validator])
+        self.assertEqual([], list(validator))
+        self.assertEqual(2, validator.skipped)
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.read_size = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.read_size += len(chunk)
+        return chunk
+
+
+array_schema = JsonArray(JsonObject(
+    JsonField('name', JsonString, NotNull, MaxLength(4)),
+    JsonField('level', JsonInteger),
+))
+
+
+def _array_document(count):
+    return b'[' + b', '.join([b'{"name": "n%d", "level": %d}' % (i % 100, i) for i in range(count)]) + b']'
+
+
+class TestIterArray(unittest.TestCase):
+    def test_elements(self):
+        expected = [{'name': 'n%d' % (i % 100), 'level': i} for i in range(300)]
+        for buffer_size in [1, 5, 64, 100000]:
+            stream = io.BytesIO(_array_document(300))
+            self.assertEqual(expected, list(json_stream.iter_array(array_schema, stream, buffer_size=buffer_size)))
+
+    def test_empty_and_null(self):
+        self.assertEqual([], list(json_stream.iter_array(array_schema, io.BytesIO(b' [ ] '))))
+        self.assertEqual([], list(json_stream.iter_array(array_schema, io.BytesIO(b'null'))))
+
+    def test_not_array(self):
+        try:
+            list(json_stream.iter_array(array_schema, io.BytesIO(b'{"name": "abc"}'), ['root']))
+            self.assertTrue(False)
+        except TypeError as ex:
+            self.assertEqual('root: Should be an array', ex.args[0])
+
+    def test_element_error_rejected_early(self):
+        data = b'[{"name": "abc"}, {"name": "abcde"}, ' + _array_document(10000)[1:]
+        stream = CountingReader(data)
+        elements = json_stream.iter_array(array_schema, stream, buffer_size=256)
+        self.assertEqual({'name': 'abc', 'level': None}, next(elements))
+        try:
+            next(elements)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('1.name: String is too long', ex.args[0])
+        self.assertLess(stream.read_size, 1024)
+
+    def test_syntax_error_rejected_early(self):
+        data = b'[{"name": "abc"} {"name": "def"}, ' + _array_document(10000)[1:]
+        stream = CountingReader(data)
+        try:
+            list(json_stream.iter_array(array_schema, stream, buffer_size=256))
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertTrue(ex.args[0].startswith("Expecting ',' delimiter"))
+        self.assertLess(stream.read_size, 1024)
+
+    def test_extra_data(self):
+        try:
+            list(json_stream.iter_array(array_schema, io.BytesIO(b'[] []')))
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertTrue(ex.args[0].startswith('Extra data'))
+
+    def test_error_positions(self):
+        records = b',\n'.join([b'{"name": "n%d"}' % i for i in range(200)])
+        for data in [b'[' + records + b',\n  {"name" "x"}]', b'[' + records + b'\n  {"name": "x"}]',
+                     b'[' + records + b'] x', b'[' + records + b', {"name": "x"}, ' + b'{"name": "y"} ' * 50 + b']']:
+            try:
+                json.loads(data)
+                self.assertTrue(False)
+            except json.JSONDecodeError as ex:
+                expected = ex
+            for buffer_size in [7, 64, 100000]:
+                try:
+                    list(json_stream.iter_array(array_schema, io.BytesIO(data), buffer_size=buffer_size))
+                    self.assertTrue(False)
+                except json.JSONDecodeError as ex:
+                    self.assertEqual(expected.args[0], ex.args[0])
+                    self.assertEqual((expected.pos, expected.lineno, expected.colno), (ex.pos, ex.lineno, ex.colno))
+
+
+if __name__ == '__main__':
+    unittest.main()
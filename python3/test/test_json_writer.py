@@ -0,0 +1,151 @@
+import io
+import json
+import unittest
+from src.json_schema_dsl import *
+from src.filters import *
+from src import json_outgoing
+from src import json_writer
+
+ROOT = ['root']
+
+schema1 = JsonObject(
+    JsonField('node', JsonString),
+    JsonField('user', JsonArray(JsonString, ToString)),
+    JsonField('tag', JsonObject(
+        JsonField('name', JsonString, Trim),
+        JsonField('level', JsonInteger)
+    )),
+    JsonField('score', JsonNumber),
+    JsonField('alarm', JsonBoolean),
+    JsonField('spec', JsonStringMap),
+    JsonField('extra', JsonAny),
+    JsonField('event', JsonTaggedUnion('kind', {
+        'click': JsonObject(JsonField('kind', JsonString), JsonField('x', JsonInteger)),
+        'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonString, ToString)),
+    }))
+)
+
+VALID = [
+    {},
+    None,
+    {'node': 'abc', 'xxx': 1},
+    {'node': None, 'user': None, 'tag': None},
+    {'node': 'café "quoted"\n', 'user': [1, 'b', None], 'tag': {'name': ' ab ', 'level': 2}},
+    {'user': [], 'tag': {}, 'score': 1, 'alarm': False},
+    {'score': 1.5, 'alarm': True, 'spec': {'a': 'b'}, 'extra': {'x': [1, None, 'y']}},
+    {'score': float('inf'), 'event': {'kind': 'scroll', 'delta': 1.5, 'x': 3}},
+    {'event': {'x': 2, 'kind': 'click'}},
+]
+
+INVALID = [
+    5,
+    {'node': 5},
+    {'tag': 'abc'},
+    {'tag': {'level': True}},
+    {'user': {'abc': 1}},
+    {'score': '1'},
+    {'alarm': 1},
+    {'spec': {'a': 1}},
+    {'event': {'kind': 'zoom'}},
+    {'event': {'kind': 'click', 'x': 'abc'}},
+]
+
+
+class TestDumpsOutgoing(unittest.TestCase):
+    def test_same_as_convert_and_dumps(self):
+        dumps = json_writer.compile_writer(schema1)
+        for data in VALID:
+            expected = json.dumps(json_outgoing.convert(schema1, data))
+            self.assertEqual(expected, dumps(data))
+
+    def test_same_errors(self):
+        for data in INVALID:
+            try:
+                json_outgoing.convert(schema1, data, ROOT)
+                self.assertTrue(False)
+            except (ValueError, TypeError) as ex:
+                expected = ex
+            try:
+                json_writer.dumps_outgoing(schema1, data, ROOT)
+                self.assertTrue(False)
+            except (ValueError, TypeError) as ex:
+                self.assertEqual(type(expected), type(ex))
+                self.assertEqual(expected.args[0], ex.args[0])
+
+    def test_schema_field_order(self):
+        data = {'alarm': True, 'tag': {'level': 1, 'name': 'x'}, 'node': 'n'}
+        expected = '{"node": "n", "tag": {"name": "x", "level": 1}, "alarm": true}'
+        self.assertEqual(expected, json_writer.dumps_outgoing(schema1, data))
+
+    def test_array_schema(self):
+        schema = JsonArray(JsonObject(JsonField('user', JsonString)))
+        self.assertEqual('[{"user": "xyz"}, null, {}]', json_writer.dumps_outgoing(schema, [{'user': 'xyz'}, None, {}]))
+        self.assertEqual('[]', json_writer.dumps_outgoing(schema, []))
+
+    def test_writer_is_cached(self):
+        json_writer.dumps_outgoing(schema1, {'node': 'n'})
+        dumps = json_writer._WRITERS[id(schema1)][1]
+        json_writer.dumps_outgoing(schema1, {'node': 'n'})
+        self.assertIs(dumps, json_writer._WRITERS[id(schema1)][1])
+
+
+class RecordingFile:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+class TestDumpOutgoing(unittest.TestCase):
+    def test_generator(self):
+        schema = JsonArray(JsonObject(JsonField('id', JsonInteger), JsonField('name', JsonString, ToString)))
+        rows = ({'id': i, 'name': i} for i in range(1000))
+        fp = RecordingFile()
+        json_writer.dump_outgoing(schema, rows, fp, chunk_parts=100)
+        expected = json.dumps([{'id': i, 'name': str(i)} for i in range(1000)])
+        self.assertEqual(expected, ''.join(fp.chunks))
+        self.assertTrue(len(fp.chunks) > 10)
+        self.assertTrue(max([len(x) for x in fp.chunks]) < 2000)
+
+    def test_nested_iterables(self):
+        schema = JsonObject(JsonField('users', JsonArray(JsonString)), JsonField('empty', JsonArray(JsonString)))
+        data = {'users': (x for x in ['a', 'b']), 'empty': iter(())}
+        fp = io.BytesIO()
+        json_writer.dump_outgoing(schema, data, fp, encoding='utf-8')
+        self.assertEqual(b'{"users": ["a", "b"], "empty": []}', fp.getvalue())
+
+    def test_not_array(self):
+        schema = JsonObject(JsonField('users', JsonArray(JsonString)))
+        for value in ['abc', {'a': 'b'}, 5]:
+            try:
+                json_writer.dump_outgoing(schema, {'users': value}, io.StringIO())
+                self.assertTrue(False)
+            except TypeError as ex:
+                self.assertEqual('users: Should be an array', ex.args[0])
+
+    def test_writer_is_shared_with_dumps(self):
+        fp = io.StringIO()
+        json_writer.dump_outgoing(schema1, {'node': 'n'}, fp)
+        self.assertEqual(json_writer.dumps_outgoing(schema1, {'node': 'n'}), fp.getvalue())
+        writer = json_writer._WRITERS[id(schema1)][1]
+        json_writer.dump_outgoing(schema1, {'node': 'n'}, io.BytesIO(), chunk_parts=1, encoding='utf-8')
+        self.assertIs(writer, json_writer._WRITERS[id(schema1)][1])
+
+
+comment_ref = JsonRef('Comment')
+schema_comment = bind_ref(comment_ref, JsonObject(
+    JsonField('text', JsonString, ToString),
+    JsonField('replies', JsonArray(comment_ref)),
+))
+
+
+class TestRef(unittest.TestCase):
+    def test_same_as_convert_and_dumps(self):
+        data = {'text': 1, 'replies': [{'text': 'b'}, {'replies': [{'text': 'd', 'replies': []}]}]}
+        expected = json.dumps(json_outgoing.convert(schema_comment, data))
+        self.assertEqual(expected, json_writer.dumps_outgoing(schema_comment, data))
+
+
+if __name__ == '__main__':
+    unittest.main()
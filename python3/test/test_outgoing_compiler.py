@@ -0,0 +1,133 @@
+import unittest
+from src.json_schema_dsl import *
+from src.validators import *
+from src.filters import *
+from src import json_outgoing
+from src import outgoing_compiler
+
+ROOT = ['root']
+
+
+def _default(value, path):
+    return 'default' if value is None else value
+
+
+Default = SchemaFilter('filter', 'Default', _default)
+
+schema1 = JsonObject(
+    JsonField('node', JsonString, Trim),
+    JsonField('user', JsonArray(JsonString, ToString)),
+    JsonField('tag', JsonObject(
+        JsonField('name', JsonString, MaxLength(4)),
+        JsonField('level', JsonInteger)
+    )),
+    JsonField('label', JsonString, Default),
+    JsonField('owner', JsonString, NotNull),
+    JsonField('spec', JsonStringMap),
+    JsonField('extra', JsonAny),
+    JsonField('event', JsonTaggedUnion('kind', {
+        'click': JsonObject(JsonField('kind', JsonString), JsonField('x', JsonInteger)),
+        'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonString, ToString)),
+    }))
+)
+
+VALID = [
+    None,
+    {'owner': 'o'},
+    {'owner': 'o', 'node': ' abc ', 'xxx': 1},
+    {'event': {'kind': 'scroll', 'delta': 1.5}, 'user': [1, 'b', None], 'owner': 'o'},
+    {'node': None, 'user': None, 'tag': {'level': 2}, 'label': 'l', 'owner': 'o', 'spec': {'a': 'b'},
+     'extra': [1], 'event': None},
+    {'node': None, 'user': None, 'tag': {}, 'label': None, 'owner': 'o', 'spec': None, 'extra': 1, 'event': None,
+     'xxx': 1, 'yyy': 2},
+]
+
+INVALID = [
+    5,
+    {},
+    {'owner': 5},
+    {'owner': 'o', 'tag': {'name': 'abcde'}},
+    {'owner': 'o', 'user': 'abc'},
+    {'owner': 'o', 'spec': {'a': 1}},
+    {'owner': 'o', 'event': {'kind': 'zoom'}},
+    {'owner': 5, 'tag': {'name': 'abcde'}},
+    {'spec': {'a': 1}},
+]
+
+
+class TestCompileOutgoing(unittest.TestCase):
+    def test_same_result(self):
+        converter = outgoing_compiler.compile_outgoing(schema1)
+        for data in VALID:
+            expected = json_outgoing.convert(schema1, data)
+            result = converter(data)
+            self.assertEqual(expected, result)
+            if result is not None:
+                self.assertEqual(list(expected), list(result))
+
+    def test_same_errors(self):
+        converter = outgoing_compiler.compile_outgoing(schema1)
+        for data in INVALID:
+            try:
+                json_outgoing.convert(schema1, data, ROOT)
+                self.assertTrue(False)
+            except (ValueError, TypeError) as ex:
+                expected = ex
+            try:
+                converter(data, ROOT)
+                self.assertTrue(False)
+            except (ValueError, TypeError) as ex:
+                self.assertEqual(type(expected), type(ex))
+                self.assertEqual(expected.args[0], ex.args[0])
+
+    def test_iterable_array(self):
+        converter = outgoing_compiler.compile_outgoing(schema1)
+        result = converter({'owner': 'o', 'user': (x for x in [1, 'b'])})
+        self.assertEqual({'owner': 'o', 'label': 'default', 'user': ['1', 'b']}, result)
+
+    def test_schema_field_order(self):
+        converter = outgoing_compiler.compile_outgoing(schema1)
+        result = converter({'extra': 1, 'node': 'a', 'owner': 'o'})
+        self.assertEqual(['node', 'label', 'owner', 'extra'], list(result))
+
+    def test_generator_error_in_sparse_object(self):
+        schema = JsonObject(JsonField('a', JsonString), JsonField('b', JsonString),
+                            JsonField('rows', JsonArray(JsonInteger)))
+        converter = outgoing_compiler.compile_outgoing(schema)
+        try:
+            converter({'rows': (x for x in [1, 'x', 2])})
+            self.assertTrue(False)
+        except TypeError as ex:
+            self.assertEqual('rows.1: Should be an integer', ex.args[0])
+        results, errors = json_outgoing.convert_many(schema, [{'rows': (x for x in [1, 'x', 2])}])
+        self.assertEqual([None], results)
+        self.assertEqual('rows.1: Should be an integer', errors[0][1].args[0])
+
+
+class TestSkipsMissing(unittest.TestCase):
+    def test_none_safe_filters(self):
+        self.assertTrue(outgoing_compiler.skips_missing([]))
+        self.assertTrue(outgoing_compiler.skips_missing([Trim, ToString, MaxLength(3), Range(1, 2)]))
+
+    def test_filters_that_must_run(self):
+        self.assertFalse(outgoing_compiler.skips_missing([NotNull]))
+        self.assertFalse(outgoing_compiler.skips_missing([Trim, NotEmpty]))
+        self.assertFalse(outgoing_compiler.skips_missing([Default]))
+
+
+comment_ref = JsonRef('Comment')
+schema_comment = bind_ref(comment_ref, JsonObject(
+    JsonField('text', JsonString, ToString),
+    JsonField('replies', JsonArray(comment_ref)),
+))
+
+
+class TestRef(unittest.TestCase):
+    def test_same_as_convert(self):
+        converter = outgoing_compiler.compile_outgoing(schema_comment)
+        data = {'text': 1, 'replies': [{'text': 'b', 'xxx': 1}, {'replies': [{'text': 'd', 'replies': []}]}]}
+        self.assertEqual(json_outgoing.convert(schema_comment, data), converter(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
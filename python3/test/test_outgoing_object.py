@@ -177,5 +177,131 @@ class TestSchema7(unittest.TestCase):
         self.assertEqual(data, result)
 
 
+class TestIterableArray(unittest.TestCase):
+    def test_generator(self):
+        data = {'user': (x for x in ['abc', None]), 'event': ({'name': x} for x in ['a', 'b'])}
+        result = json_outgoing.convert(schema1, data)
+        self.assertEqual({'user': ['abc', None], 'event': [{'name': 'a'}, {'name': 'b'}]}, result)
+
+    def test_string_is_not_array(self):
+        try:
+            json_outgoing.convert(schema1, {'user': 'abc'})
+            self.assertTrue(False)
+        except TypeError as ex:
+            self.assertEqual('user: Should be an array', ex.args[0])
+
+
+class TestTrusted(unittest.TestCase):
+    def test_same_result(self):
+        data = {'node': 'abc', 'user': ['def', None], 'tag': {'name': 'x'}, 'event': [{'name': 'a'}, None], 'xxx': 1}
+        self.assertEqual(json_outgoing.convert(schema1, data), json_outgoing.convert(schema1, data, trusted=True))
+
+    def test_filters_still_run(self):
+        data = {'object_id': 56, 'userIds': (x for x in [3, 7])}
+        result = json_outgoing.convert(schema5, data, trusted=True)
+        self.assertEqual({'object_id': '56', 'userIds': ['3', '7']}, result)
+
+    def test_skips_type_checks(self):
+        data = {'node': 5, 'tag': {'level': 'abc'}}
+        result = json_outgoing.convert(schema1, data, trusted=True)
+        self.assertEqual(data, result)
+
+    def test_sampled_check(self):
+        try:
+            json_outgoing.convert(schema1, {'node': 5}, trusted=True, check_rate=1.0)
+            self.assertTrue(False)
+        except TypeError as ex:
+            self.assertEqual('node: Should be a string', ex.args[0])
+
+    def test_convert_many(self):
+        records = [{'node': 5}, {'node': 'abc', 'xxx': 1}]
+        results, errors = json_outgoing.convert_many(schema1, records, trusted=True)
+        self.assertEqual([{'node': 5}, {'node': 'abc'}], results)
+        self.assertEqual([], errors)
+        results, errors = json_outgoing.convert_many(schema1, records, trusted=True, check_rate=1.0)
+        self.assertEqual([None, {'node': 'abc'}], results)
+        self.assertEqual(0, errors[0][0])
+
+    def test_tagged_union(self):
+        data = {'kind': 'scroll', 'delta': 1.5, 'x': 3}
+        self.assertEqual({'kind': 'scroll', 'delta': '1.5'}, json_outgoing.convert(schema_tagged, data, trusted=True))
+
+
+class TestConvertMany(unittest.TestCase):
+    def test_partial_failure(self):
+        records = [{'node': 'abc', 'xxx': 1}, {'node': 5}, None]
+        results, errors = json_outgoing.convert_many(schema1, records)
+        self.assertEqual([{'node': 'abc'}, None, None], results)
+        self.assertEqual(1, len(errors))
+        self.assertEqual(1, errors[0][0])
+        self.assertEqual('node: Should be a string', errors[0][1].args[0])
+
+    def test_converter_is_cached(self):
+        json_outgoing.convert_many(schema1, [])
+        converter = json_outgoing._CONVERTERS[id(schema1)][1]
+        json_outgoing.convert_many(schema1, [{'node': 'abc'}])
+        self.assertIs(converter, json_outgoing._CONVERTERS[id(schema1)][1])
+
+    def test_same_error_as_convert(self):
+        records = [{'tag': {'level': 'x'}, 'node': 5}]
+        results, errors = json_outgoing.convert_many(schema1, records)
+        try:
+            json_outgoing.convert(schema1, records[0])
+            self.assertTrue(False)
+        except (ValueError, TypeError) as ex:
+            self.assertEqual(ex.args[0], errors[0][1].args[0])
+
+
+schema_tagged = JsonTaggedUnion('kind', {
+    'click': JsonObject(JsonField('kind', JsonString), JsonField('x', JsonInteger)),
+    'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonString, ToString)),
+})
+
+
+class TestTaggedUnion(unittest.TestCase):
+    def test_branch(self):
+        data = {'kind': 'scroll', 'delta': 1.5, 'x': 3}
+        result = json_outgoing.convert(schema_tagged, data)
+        self.assertEqual({'kind': 'scroll', 'delta': '1.5'}, result)
+
+    def test_error_in_branch(self):
+        data = {'kind': 'click', 'x': 'abc'}
+        try:
+            json_outgoing.convert(schema_tagged, data, ROOT)
+            self.assertTrue(False)
+        except TypeError as ex:
+            self.assertEqual('root.x: Should be an integer', ex.args[0])
+
+    def test_unknown_tag(self):
+        try:
+            json_outgoing.convert(schema_tagged, {'kind': 'zoom'})
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('kind: Invalid value', ex.args[0])
+
+comment_ref = JsonRef('Comment')
+schema_comment = bind_ref(comment_ref, JsonObject(
+    JsonField('text', JsonString, ToString),
+    JsonField('replies', JsonArray(comment_ref)),
+))
+
+THREAD = {'text': 'a', 'replies': [{'text': 'b'}, {'text': 'c', 'replies': [{'text': 'd', 'replies': []}]}]}
+
+
+class TestRef(unittest.TestCase):
+    def test_nested(self):
+        data = {'text': 1, 'replies': [{'text': 2, 'xxx': 3, 'replies': [{'text': 'd'}]}]}
+        expected = {'text': '1', 'replies': [{'text': '2', 'replies': [{'text': 'd'}]}]}
+        self.assertEqual(expected, json_outgoing.convert(schema_comment, data))
+        self.assertEqual(expected, json_outgoing.convert(schema_comment, data, trusted=True))
+
+    def test_deep_error(self):
+        try:
+            json_outgoing.convert(schema_comment, {'replies': [{'replies': [{'replies': 'abc'}]}]})
+            self.assertTrue(False)
+        except TypeError as ex:
+            self.assertEqual('replies.0.replies.0.replies: Should be an array', ex.args[0])
+
+
 if __name__ == '__main__':
     unittest.main()
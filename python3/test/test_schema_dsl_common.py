@@ -0,0 +1,95 @@
+import unittest
+from src.schema_dsl_common import *
+
+
+class TestPathNode(unittest.TestCase):
+    def test_to_list(self):
+        path = PathNode(PathNode(['root'], 'event'), 1)
+        self.assertEqual(['root', 'event', '1'], path.to_list())
+
+    def test_without_root(self):
+        path = PathNode(PathNode(None, 'event'), 0)
+        self.assertEqual(['event', '0'], path.to_list())
+        self.assertEqual(2, len(path))
+
+    def test_add_list(self):
+        path = PathNode([], 'spec') + ['name']
+        self.assertEqual(['spec', 'name'], path)
+
+    def test_message(self):
+        path = PathNode(PathNode([], 'user'), 3)
+        self.assertEqual('user.3: Should be a string', get_message(path, 'Should be a string'))
+
+    def test_parent_not_copied(self):
+        root = ['root']
+        path = PathNode(root, 'node')
+        self.assertIs(root, path.parent)
+        self.assertEqual(['root'], root)
+
+
+class TestFindField(unittest.TestCase):
+    def test_find_field(self):
+        field = {'name': 'node', 'field_type': {'type': 'String'}, 'filters': ()}
+        schema = {'type': 'Object', 'fields': (field,), 'field_map': {'node': field}}
+        self.assertIs(field, find_field(schema, 'node'))
+        self.assertIsNone(find_field(schema, 'user'))
+
+
+class TestCompileCached(unittest.TestCase):
+    def test_reuses_compiled_value(self):
+        cache = {}
+        schema = {'type': 'String'}
+        compiled = compile_cached(schema, cache, lambda x: object())
+        self.assertIs(compiled, compile_cached(schema, cache, lambda x: object()))
+        self.assertIsNot(compiled, compile_cached({'type': 'String'}, cache, lambda x: object()))
+
+    def test_bounded(self):
+        cache = {}
+        schemas = [{'type': 'String'} for i in range(COMPILED_CACHE_SIZE + 1)]
+        for schema in schemas:
+            compile_cached(schema, cache, lambda x: x)
+        self.assertEqual(1, len(cache))
+
+
+class TestSchemaValidationError(unittest.TestCase):
+    def test_message(self):
+        ex = SchemaValueError(PathNode(['root'], 'node'), 'too_long', 4)
+        self.assertEqual('root.node: String is too long', str(ex))
+        self.assertEqual(('root.node: String is too long',), ex.args)
+        self.assertEqual(4, ex.constraint)
+        self.assertIsInstance(ex, ValueError)
+        self.assertIsInstance(ex, SchemaValidationError)
+
+    def test_type_error(self):
+        ex = SchemaTypeError([], 'not_string')
+        self.assertEqual('Should be a string', ex.args[0])
+        self.assertIsInstance(ex, TypeError)
+        self.assertNotIsInstance(ex, ValueError)
+
+    def test_unrecognized_field(self):
+        ex = SchemaValueError(['root'], 'unrecognized_field', ['xxx'])
+        self.assertEqual('root: Unrecognized field: xxx', ex.args[0])
+
+    def test_root_path_is_copied(self):
+        path = ['root']
+        ex = SchemaValueError(path, 'too_small', 0)
+        path.append('level')
+        self.assertEqual('root: Value is too small', str(ex))
+        self.assertEqual(('root',), ex.path)
+
+    def test_path_tuple(self):
+        ex = SchemaTypeError(PathNode(PathNode(['root'], 'user'), 1), 'not_string')
+        self.assertEqual(('root', 'user', 1), ex.path)
+        self.assertIs(ex.path, ex.path)
+        self.assertEqual('root.user.1: Should be a string', ex.args[0])
+        self.assertEqual({ex.path}, {('root', 'user', 1)})
+
+    def test_pickle(self):
+        import pickle
+        ex = pickle.loads(pickle.dumps(SchemaTypeError(PathNode([], 'user') + [1], 'not_string')))
+        self.assertIsInstance(ex, SchemaTypeError)
+        self.assertEqual('user.1: Should be a string', ex.args[0])
+        self.assertEqual(('user', 1), ex.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -163,5 +163,35 @@ class TestSchemaGetter(unittest.TestCase):
             self.assertEqual("Path is too long", ex.args[0])
 
 
+schema_tagged = JsonTaggedUnion('kind', {
+    'click': JsonObject(JsonField('kind', JsonString), JsonField('pos', JsonObject(JsonField('x', JsonInteger)))),
+    'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonNumber)),
+})
+
+
+class TestTaggedUnionGetter(unittest.TestCase):
+    def test_get_branch_field(self):
+        data = {'kind': 'click', 'pos': {'x': 3}}
+        self.assertEqual(3, schema_getter.getter(schema_tagged, ['pos', 'x'], data))
+
+    def test_field_of_other_branch(self):
+        data = {'kind': 'click', 'pos': {'x': 3}}
+        try:
+            schema_getter.getter(schema_tagged, ['delta'], data)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('Unrecognized field: delta', ex.args[0])
+
+
+node_ref = JsonRef('Node')
+schema_tree = bind_ref(node_ref, JsonObject(JsonField('name', JsonString), JsonField('children', JsonArray(node_ref))))
+
+
+class TestRefGetter(unittest.TestCase):
+    def test_get_nested(self):
+        data = {'name': 'a', 'children': [{'name': 'b', 'children': [{'name': 'c'}]}]}
+        self.assertEqual('c', schema_getter.getter(schema_tree, ['children', 0, 'children', 0, 'name'], data))
+        self.assertIsNone(schema_getter.getter(schema_tree, ['children', 0, 'children', 0, 'children'], data))
+
 if __name__ == '__main__':
     unittest.main()
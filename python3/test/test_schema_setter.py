@@ -175,5 +175,43 @@ class TestSchemaSetter(unittest.TestCase):
             self.assertEqual('Path is too long', ex.args[0])
 
 
+schema_tagged = JsonTaggedUnion('kind', {
+    'click': JsonObject(JsonField('kind', JsonString), JsonField('pos', JsonObject(JsonField('x', JsonInteger)))),
+    'scroll': JsonObject(JsonField('kind', JsonString), JsonField('delta', JsonNumber)),
+})
+
+
+class TestTaggedUnionSetter(unittest.TestCase):
+    def test_set_branch_field(self):
+        data = {'kind': 'click'}
+        schema_setter.setter(schema_tagged, ['pos', 'x'], data, 5)
+        self.assertEqual({'kind': 'click', 'pos': {'x': 5}}, data)
+
+    def test_field_of_other_branch(self):
+        data = {'kind': 'scroll'}
+        try:
+            schema_setter.setter(schema_tagged, ['pos', 'x'], data, 5)
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('Unrecognized field: pos', ex.args[0])
+
+
+node_ref = JsonRef('Node')
+schema_tree = bind_ref(node_ref, JsonObject(JsonField('name', JsonString), JsonField('children', JsonArray(node_ref))))
+
+
+class TestRefSetter(unittest.TestCase):
+    def test_set_nested(self):
+        data = {'name': 'a'}
+        schema_setter.setter(schema_tree, ['children', 0, 'children', 1, 'name'], data, 'c')
+        self.assertEqual({'name': 'a', 'children': [{'children': [None, {'name': 'c'}]}]}, data)
+
+    def test_unrecognized_nested(self):
+        try:
+            schema_setter.setter(schema_tree, ['children', 0, 'other'], {}, 'c')
+            self.assertTrue(False)
+        except ValueError as ex:
+            self.assertEqual('Unrecognized field: other', ex.args[0])
+
 if __name__ == '__main__':
     unittest.main()
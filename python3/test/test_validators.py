@@ -255,5 +255,23 @@ class TestPattern(unittest.TestCase):
             self.assertEqual('root: Pattern not match', ex.args[0])
 
 
+class TestErrorCode(unittest.TestCase):
+
+    def test_codes(self):
+        cases = [(validators.NotNull, None, 'not_null', None),
+                 (validators.NotEmpty, '', 'empty', None),
+                 (validators.MaxLength(2), 'abc', 'too_long', 2),
+                 (validators.LengthRange(2, 3), 'a', 'too_short', 2),
+                 (validators.Only('a', 'b'), 'c', 'not_in_options', ('a', 'b')),
+                 (validators.Range(1, 3), 4, 'too_large', 3),
+                 (validators.ExclusiveMinimum(1), 1, 'too_small', 1),
+                 (validators.Pattern('^a'), 'b', 'pattern_mismatch', '^a')]
+        for validator, value, code, constraint in cases:
+            try:
+                validator(value, ['node'])
+                self.assertTrue(False)
+            except validators.SchemaValidationError as ex:
+                self.assertEqual((('node',), code, constraint), (ex.path, ex.code, ex.constraint))
+
 if __name__ == '__main__':
     unittest.main()